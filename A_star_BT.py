@@ -1,4 +1,9 @@
 import heapq
+import mmap
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 class PathNode:
     def __init__(self, parent=None, position=None):
@@ -13,6 +18,25 @@ class PathNode:
     def __eq__(self, other):
         return self.position == other.position
 
+# 8방향 (상, 하, 좌, 우, 대각선) 이동과 이동 비용 (직선 10, 대각선 14)
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+MOVE_COSTS = [10, 10, 10, 10, 14, 14, 14, 14]
+
+# 탐색 통계 (호출 횟수, 누적 확장 노드 수, 마지막 탐색의 확장 노드 수, 마지막 양방향 탐색의 정방향/역방향 확장 수)
+search_stats = {'calls': 0, 'expanded': 0, 'last_expanded': 0, 'last_forward': 0, 'last_backward': 0}
+
+class ZeroHeuristic:
+    # 모든 칸의 휴리스틱이 0인 테이블 (astar_cells를 Dijkstra로 사용)
+    def __getitem__(self, index):
+        return 0
+
+ZERO_HEURISTIC = ZeroHeuristic()
+
+def record_search(expanded):
+    search_stats['calls'] += 1
+    search_stats['expanded'] += expanded
+    search_stats['last_expanded'] = expanded
+
 # 휴리스틱 코스트 함수
 def heuristic(current_node, end_node):
     # 현재 노드와 도착점 노드의 위치
@@ -25,92 +49,624 @@ def heuristic(current_node, end_node):
 
     weight = 1.0 # 가중치
     cost = (10 * max(dx, dy) + 4 * min(dx, dy)) * weight
-    
+
     return cost
 
-def astar(start, end, grid):
-    open_list = []  # 열린 리스트
-    close_list = [] # 닫힌 리스트
-    count = 0
+def flatten_grid(grid):
+    # 2차원 grid(리스트 또는 numpy 배열)를 1차원 리스트로 펼쳐서 (셀 리스트, 행 수, 열 수) 반환
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+
+    if hasattr(grid, 'ravel'): # numpy 배열이면 한 번에 변환
+        return grid.ravel().tolist(), rows, cols
+
+    cells = []
+    for row in grid:
+        cells.extend(row)
+    return cells, rows, cols
+
+def grid_cells(grid):
+    # 한 번의 탐색용: grid를 복사하지 않고 1차원 인덱스로 읽을 수 있는 (셀 배열, 행 수, 열 수) 반환
+    # numpy 배열(memmap 포함)은 메모리를 그대로 보는 memoryview라서 grid 크기와 상관없이 O(1)
+    # 리스트 grid만 flatten_grid()로 펼침
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+
+    if hasattr(grid, 'ravel'):
+        return memoryview(grid.ravel()), rows, cols
+    return flatten_grid(grid)
+
+def build_path(parent, index, cols):
+    # parent 배열을 따라 도착점에서 시작점까지 역추적한 뒤 (row, col) 경로로 반환
+    temp_path = []
+    while index != -1:
+        temp_path.append(divmod(index, cols))
+        index = parent[index]
+
+    return temp_path[::-1]
+
+def astar(start, end, grid, mode='astar', landmarks=None, **options):
+    # mode: 'astar' (기본 A*), 'jps' (Jump Point Search, 같은 비용의 경로), 'dijkstra' (휴리스틱 없음)
+    #       'bidirectional' (양방향 A*), 'bidirectional_dijkstra' (양방향 Dijkstra)
+    #       또는 'ara' (ARA*, (경로, 최적 대비 배율 상한)을 반환. options: weight, weight_step, max_expansions, time_limit)
+    # landmarks: landmarks_BT.load_landmarks()로 연 거리 테이블 (주면 랜드마크(ALT) 휴리스틱 사용)
+    cells, rows, cols = grid_cells(grid)
+
+    heuristic_table = None
+    if landmarks is not None:
+        import landmarks_BT
+        heuristic_table = landmarks_BT.landmark_heuristic(landmarks, end, rows, cols)
 
-    start_node = PathNode(None, start)
-    end_node = PathNode(None, end)
+    return search_cells(start, end, cells, rows, cols, mode, heuristic_table, **options)
 
-    heapq.heappush(open_list, (start_node.f, count, start_node))
+def search_cells(start, end, cells, rows, cols, mode='astar', heuristic_table=None, **options):
+    # 펼쳐진 셀 배열에서 mode에 맞는 탐색 함수를 호출
+    if mode == 'jps':
+        return jps_cells(start, end, cells, rows, cols, heuristic_table)
+    if mode == 'ara':
+        return ara_cells(start, end, cells, rows, cols, heuristic_table, **options)
+    if mode == 'bidirectional':
+        return bidirectional_cells(start, end, cells, rows, cols, heuristic_table)
+    if mode == 'bidirectional_dijkstra':
+        return bidirectional_cells(start, end, cells, rows, cols, use_heuristic=False)
+    if mode == 'dijkstra':
+        return astar_cells(start, end, cells, rows, cols, ZERO_HEURISTIC)
+    return astar_cells(start, end, cells, rows, cols, heuristic_table)
+
+def astar_cells(start, end, cells, rows, cols, heuristic_table=None):
+    # 이미 1차원으로 펼쳐진 셀 배열(리스트, bytes, mmap, memoryview 등)에서 A* 탐색 (경로가 없으면 None)
+    for event in iter_astar_cells(start, end, cells, rows, cols, heuristic_table):
+        return event[1]
+
+def iter_astar_cells(start, end, cells, rows, cols, heuristic_table=None, steps=False):
+    # astar_cells의 탐색 본체 (결과 이벤트를 내보내는 제너레이터)
+    # 내보내는 이벤트:
+    #   ('expand', 확장한 칸, [이번에 열린 리스트에 들어간 칸들]) - steps=True일 때만, 확장할 때마다 (시각화용)
+    #   ('found', 경로)  - 도착점을 확장했을 때 (확장 이벤트 대신)
+    #   ('failed', None) - 열린 리스트가 비었을 때
+    end_r, end_c = end
+    start_index = start[0] * cols + start[1]
+    end_index = end_r * cols + end_c
+
+    # PathNode 객체 대신 셀 인덱스 기반 집합/딕셔너리 사용 (탐색한 칸 수에만 비례하는 비용)
+    closed = set()                 # 닫힌 리스트
+    best_g = {start_index: 0}      # 지금까지 찾은 가장 작은 g 비용
+    parent = {start_index: -1}     # 부모 셀 인덱스 (출발점은 -1)
+
+    open_list = []  # 열린 리스트 (f, count, g, 셀 인덱스)
+    count = 0
+
+    heapq.heappush(open_list, (0, count, 0, start_index))
     count += 1
-    
-    while len(open_list) > 0:
 
-        current_f, _, current_node = heapq.heappop(open_list)
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    moves = list(zip(DIRECTIONS, MOVE_COSTS))
+    expanded = 0
+
+    while open_list:
+
+        _, _, current_g, current = heappop(open_list)
 
-        if current_node in close_list:
+        # 이미 닫힌 셀이면 오래된 항목이므로 건너뛰기 (lazy deletion)
+        if current in closed:
             continue
 
-        close_list.append(current_node)
-
-        # 현재 노드가 도착점이면, 경로를 역추적해서 반환하고 종료
-        if current_node == end_node:
-            temp_path = []
-            current = current_node
-            while current is not None:
-                temp_path.append(current.position)
-                current = current.parent
-            
-            return temp_path[::-1]
-
-        children = []
-        # 8방향에 대해 (상, 하, 좌, 우, 대각선)
-        for new_position in [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)]:
-        
-            # 노드 위치 계산
-            node_position = (current_node.position[0] + new_position[0], current_node.position[1] + new_position[1])
+        closed.add(current)
+        expanded += 1
+
+        # 현재 셀이 도착점이면, 경로를 역추적해서 내보내고 종료
+        if current == end_index:
+            record_search(expanded)
+            yield ('found', build_path(parent, current, cols))
+            return
+
+        current_r, current_c = divmod(current, cols)
+        opened = [] if steps else None
+
+        for (move_r, move_c), movement_cost in moves:
+            r = current_r + move_r
+            c = current_c + move_c
 
             # 맵 범위 안에 있는지 확인
-            if node_position[0] > (len(grid) - 1) or node_position[0] < 0 or node_position[1] > (len(grid[0]) - 1) or node_position[1] < 0:
+            if r < 0 or r >= rows or c < 0 or c >= cols:
                 continue
 
-            # 벽(장애물)이 아닌지 확인
-            tile_value = grid[node_position[0]][node_position[1]]
+            child = r * cols + c
 
-            # 1. 벽(1)은 항상 피함
-            if tile_value == 1:
+            # 벽(1)은 항상 피하고, 닫힌 셀은 건너뛰기
+            if cells[child] == 1 or child in closed:
                 continue
 
-            # 새로운 자식 노드 생성
-            new_node = PathNode(current_node, node_position)
-            children.append(new_node)
+            g = current_g + movement_cost
+
+            # 이미 열린 리스트에 같거나 더 좋은 g 비용이 있으면 건너뛰기
+            if child in best_g and g >= best_g[child]:
+                continue
+
+            best_g[child] = g
+            parent[child] = current
+
+            if heuristic_table is not None:
+                # 미리 계산된 휴리스틱 (랜드마크 등)
+                h = heuristic_table[child]
+            else:
+                # 대각선 거리 휴리스틱 (heuristic()과 동일한 값)
+                dr = r - end_r if r > end_r else end_r - r
+                dc = c - end_c if c > end_c else end_c - c
+                if dr > dc:
+                    h = 10 * dr + 4 * dc
+                else:
+                    h = 10 * dc + 4 * dr
 
-        for child in children:
+            heappush(open_list, (g + h, count, g, child))
+            count += 1
+            if steps:
+                opened.append((r, c))
+
+        if steps:
+            yield ('expand', (current_r, current_c), opened)
+
+    # while 루프가 끝날 때까지 경로를 못 찾으면 실패
+    record_search(expanded)
+    yield ('failed', None)
+
+# --- 양방향 탐색: 출발점과 도착점에서 동시에 탐색해서 가운데에서 만남 ---
+
+def bidirectional_cells(start, end, cells, rows, cols, heuristic_table=None, use_heuristic=True):
+    # 양방향 탐색으로 찾은 경로 (없으면 None)
+    for event in iter_bidirectional_cells(start, end, cells, rows, cols, heuristic_table, use_heuristic):
+        return event[1]
+
+def iter_bidirectional_cells(start, end, cells, rows, cols, heuristic_table=None, use_heuristic=True,
+                             backward_table=None, steps=False):
+    # use_heuristic=True면 양방향 A* (정방향은 도착점, 역방향은 출발점까지의 휴리스틱), False면 양방향 Dijkstra
+    # heuristic_table / backward_table: 정방향 / 역방향 휴리스틱 테이블 (없으면 대각선 거리)
+    # 이동 비용이 대칭(직선 10, 대각선 14)이라 역방향 탐색도 같은 이동을 사용
+    # 종료 조건 (best: 지금까지 두 탐색이 만나서 찾은 가장 짧은 경로 비용)
+    #   A*: 어느 한쪽 열린 리스트의 최소 f가 best 이상 -> 그쪽을 지나는 더 짧은 경로가 없음
+    #   Dijkstra: 두 열린 리스트의 최소 g 합이 best 이상
+    # 이벤트는 iter_astar_cells와 같고 ('expand'는 steps=True일 때만), 'found' 이벤트에 (정방향, 역방향) 확장 수가 붙음
+    start_index = start[0] * cols + start[1]
+    end_index = end[0] * cols + end[1]
+
+    def make_h(target, table):
+        if not use_heuristic:
+            return lambda index: 0
+        if table is not None:
+            return table.__getitem__
+        target_r, target_c = target
+        return lambda index: octile_cost(index // cols, index % cols, target_r, target_c)
+
+    # 방향마다 [열린 리스트, 닫힌 리스트, g, 부모, 휴리스틱]
+    forward = [[(0, 0, 0, start_index)], set(), {start_index: 0}, {start_index: -1}, make_h(end, heuristic_table)]
+    backward = [[(0, 1, 0, end_index)], set(), {end_index: 0}, {end_index: -1}, make_h(start, backward_table)]
+    count = 2
 
-            # 자식 노드가 close_list에 있다면 건너뛰기
-            if child in close_list:
+    best = 0 if start_index == end_index else -1
+    meet = start_index if start_index == end_index else -1
+    moves = list(zip(DIRECTIONS, MOVE_COSTS))
+    expanded = [0, 0] # 정방향, 역방향 확장 수
+
+    def top(side):
+        # 오래된 항목을 버리고 열린 리스트의 최소 (f, g)를 반환 (비었으면 None)
+        open_list, closed, best_g = side[0], side[1], side[2]
+        while open_list:
+            f, _, g, index = open_list[0]
+            if index in closed or g != best_g[index]:
+                heapq.heappop(open_list)
                 continue
+            return f, g
+        return None
 
-            # movement_cost를 10 또는 14로 설정하는 로직
-            movement_cost = 10  # 기본값은 직선 비용으로 설정
-        
-            # 현재 노드와 자식 노드의 x, y 좌표가 모두 다른지 확인
-            if current_node.position[0] != child.position[0] and current_node.position[1] != child.position[1]:
-                movement_cost = 14 # x, y 좌표가 모두 다르면 대각선 이동
-
-            # g, h, f 비용 계산
-            child.g = current_node.g + movement_cost
-            child.h = heuristic(child, end_node)
-            child.f = child.g + child.h
-
-            # 자식 노드가 이미 open_list에 있고, g 비용이 더 높은지 확인하는 로직
-            is_better_path = True
-            for _, _, open_node in open_list:
-                if child == open_node and child.g >= open_node.g:
-                    is_better_path = False
+    while True:
+        forward_top = top(forward)
+        backward_top = top(backward)
+        if forward_top is None or backward_top is None:
+            break
+        if best != -1:
+            if use_heuristic:
+                if forward_top[0] >= best or backward_top[0] >= best:
                     break
-        
-            if not is_better_path:
+            elif forward_top[1] + backward_top[1] >= best:
+                break
+
+        # 열린 리스트가 작은 쪽을 확장 (두 탐색의 크기를 비슷하게 유지)
+        if len(forward[0]) <= len(backward[0]):
+            side, other, direction = forward, backward, 0
+        else:
+            side, other, direction = backward, forward, 1
+        open_list, closed, best_g, parent, h_of = side
+        other_g = other[2]
+
+        _, _, current_g, current = heapq.heappop(open_list)
+        closed.add(current)
+        expanded[direction] += 1
+
+        current_r, current_c = divmod(current, cols)
+        opened = [] if steps else None
+        for (move_r, move_c), movement_cost in moves:
+            r = current_r + move_r
+            c = current_c + move_c
+            if r < 0 or r >= rows or c < 0 or c >= cols:
+                continue
+
+            child = r * cols + c
+            if cells[child] == 1 or child in closed:
+                continue
+
+            g = current_g + movement_cost
+            if child in best_g and g >= best_g[child]:
                 continue
+            best_g[child] = g
+            parent[child] = current
+
+            # 반대쪽 탐색이 이미 도달한 칸이면 두 경로를 이은 후보
+            if child in other_g and (best == -1 or g + other_g[child] < best):
+                best = g + other_g[child]
+                meet = child
 
-            # 위 모든 조건에 해당하지 않으면, open_list에 자식 노드 추가
-            heapq.heappush(open_list, (child.f, count, child))
+            heapq.heappush(open_list, (g + h_of(child), count, g, child))
             count += 1
+            if steps:
+                opened.append((r, c))
+
+        if steps:
+            yield ('expand', (current_r, current_c), opened)
+
+    search_stats['last_forward'], search_stats['last_backward'] = expanded
+    record_search(expanded[0] + expanded[1])
+    if best == -1:
+        yield ('failed', None)
+        return
+
+    # 출발점 -> 만난 칸 + (만난 칸 -> 도착점)
+    path = build_path(forward[3], meet, cols)
+    to_end = build_path(backward[3], meet, cols)
+    to_end.reverse()
+    yield ('found', path + to_end[1:], tuple(expanded))
+
+def compare_bidirectional(start, end, grid):
+    # 같은 질의를 단방향 / 양방향으로 풀어서 확장 노드 수와 경로 비용 비교
+    results = {}
+    for mode in ('dijkstra', 'bidirectional_dijkstra', 'astar', 'bidirectional'):
+        path = astar(start, end, grid, mode=mode)
+        cost = None if path is None else sum(octile_cost(r1, c1, r2, c2) for (r1, c1), (r2, c2) in zip(path, path[1:]))
+        results[mode] = {'expanded': search_stats['last_expanded'], 'cost': cost}
+    return results
+
+# --- Jump Point Search (직선 10 / 대각선 14의 균일 비용 grid 전용) ---
+
+def octile_cost(r1, c1, r2, c2):
+    # 두 셀 사이의 대각선 거리 비용 (직선 10, 대각선 14)
+    dr = abs(r1 - r2)
+    dc = abs(c1 - c2)
+    return 10 * max(dr, dc) + 4 * min(dr, dc)
+
+def jps_cells(start, end, cells, rows, cols, heuristic_table=None):
+    # A*와 같은 비용의 경로를 반환하지만, 대칭인 경로는 건너뛰고 점프 포인트만 확장
+    end_r, end_c = end
+
+    def free(r, c):
+        return 0 <= r < rows and 0 <= c < cols and cells[r * cols + c] != 1
+
+    def jump(r, c, dr, dc):
+        # (r, c)에서 (dr, dc) 방향으로 다음 점프 포인트가 나올 때까지 직진
+        while True:
+            r += dr
+            c += dc
+            if not free(r, c):
+                return None
+            if r == end_r and c == end_c:
+                return r, c
+
+            if dr and dc: # 대각선 이동
+                if (free(r + dr, c - dc) and not free(r, c - dc)) or \
+                   (free(r - dr, c + dc) and not free(r - dr, c)):
+                    return r, c
+                # 가로/세로 방향으로 점프 포인트가 있으면 현재 칸도 점프 포인트
+                if jump(r, c, dr, 0) or jump(r, c, 0, dc):
+                    return r, c
+            elif dr: # 세로 이동
+                if (free(r + dr, c + 1) and not free(r, c + 1)) or \
+                   (free(r + dr, c - 1) and not free(r, c - 1)):
+                    return r, c
+            else: # 가로 이동
+                if (free(r + 1, c + dc) and not free(r + 1, c)) or \
+                   (free(r - 1, c + dc) and not free(r - 1, c)):
+                    return r, c
+
+    def pruned_directions(r, c, parent_index):
+        # 부모 방향을 기준으로 꼭 확인해야 하는 방향(자연 이웃 + 강제 이웃)만 남김
+        if parent_index == -1:
+            return [d for d in DIRECTIONS if free(r + d[0], c + d[1])]
+
+        pr, pc = divmod(parent_index, cols)
+        dr = (r > pr) - (r < pr)
+        dc = (c > pc) - (c < pc)
+        directions = []
+
+        if dr and dc:
+            if free(r + dr, c):
+                directions.append((dr, 0))
+            if free(r, c + dc):
+                directions.append((0, dc))
+            if free(r + dr, c + dc):
+                directions.append((dr, dc))
+            if not free(r, c - dc) and free(r + dr, c - dc):
+                directions.append((dr, -dc))
+            if not free(r - dr, c) and free(r - dr, c + dc):
+                directions.append((-dr, dc))
+        elif dr:
+            if free(r + dr, c):
+                directions.append((dr, 0))
+            if not free(r, c + 1) and free(r + dr, c + 1):
+                directions.append((dr, 1))
+            if not free(r, c - 1) and free(r + dr, c - 1):
+                directions.append((dr, -1))
+        else:
+            if free(r, c + dc):
+                directions.append((0, dc))
+            if not free(r + 1, c) and free(r + 1, c + dc):
+                directions.append((1, dc))
+            if not free(r - 1, c) and free(r - 1, c + dc):
+                directions.append((-1, dc))
+
+        return directions
+
+    start_index = start[0] * cols + start[1]
+    end_index = end_r * cols + end_c
+
+    closed = set()
+    best_g = {start_index: 0}
+    parent = {start_index: -1}
+
+    open_list = []
+    count = 0
+    expanded = 0
+
+    heapq.heappush(open_list, (0, count, 0, start_index))
+    count += 1
+
+    while open_list:
+        _, _, current_g, current = heapq.heappop(open_list)
+
+        if current in closed:
+            continue
+
+        closed.add(current)
+        expanded += 1
+
+        if current == end_index:
+            record_search(expanded)
+            return expand_jump_path(build_path(parent, current, cols))
+
+        current_r, current_c = divmod(current, cols)
+
+        for dr, dc in pruned_directions(current_r, current_c, parent[current]):
+            point = jump(current_r, current_c, dr, dc)
+            if point is None:
+                continue
+
+            r, c = point
+            child = r * cols + c
+            if child in closed:
+                continue
+
+            g = current_g + octile_cost(current_r, current_c, r, c)
+            if child in best_g and g >= best_g[child]:
+                continue
+
+            best_g[child] = g
+            parent[child] = current
+            if heuristic_table is not None:
+                h = heuristic_table[child]
+            else:
+                h = octile_cost(r, c, end_r, end_c)
+            heapq.heappush(open_list, (g + h, count, g, child))
+            count += 1
+
+    record_search(expanded)
+    return None
+
+def expand_jump_path(jump_points):
+    # 점프 포인트 사이를 한 칸씩 채워서 에이전트가 따라갈 수 있는 경로로 변환
+    path = [jump_points[0]]
+    for (r2, c2) in jump_points[1:]:
+        r, c = path[-1]
+        dr = (r2 > r) - (r2 < r)
+        dc = (c2 > c) - (c2 < c)
+        while (r, c) != (r2, c2):
+            r += dr
+            c += dc
+            path.append((r, c))
+
+    return path
+
+# --- ARA* (Anytime Repairing A*): 큰 가중치로 빨리 찾은 경로를 점점 최적 경로로 개선 ---
+
+def iter_ara_cells(start, end, cells, rows, cols, heuristic_table=None, weight=3.0, weight_step=0.5,
+                   max_expansions=None, time_limit=None):
+    # 경로를 찾거나 개선할 때마다 (경로, 최적 비용 대비 최대 배율)을 내보냄
+    # 가중치를 weight에서 weight_step씩 줄여가며 다시 탐색하되, 이전 탐색의 g 값과 열린 리스트를 그대로 재사용
+    # 첫 경로는 예산과 상관없이 찾고, 그 다음부터 max_expansions(누적 확장 수)나 time_limit(초)를 넘으면 멈춤
+    end_r, end_c = end
+    start_index = start[0] * cols + start[1]
+    end_index = end_r * cols + end_c
+
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+    def h_of(index):
+        if heuristic_table is not None:
+            return heuristic_table[index]
+        r, c = divmod(index, cols)
+        return octile_cost(r, c, end_r, end_c)
+
+    best_g = {start_index: 0}
+    parent = {start_index: -1}
+    closed = set()            # 이번 가중치에서 확장한 칸
+    open_set = set()          # 열린 리스트에 있는 칸 (힙에는 오래된 항목이 섞여 있음)
+    incons = set()            # 이번 가중치에서 이미 확장했는데 g가 줄어든 칸 (다음 가중치에서 다시 확장)
+    open_list = []            # (f, count, g, 셀 인덱스)
+    count = 0
+    expanded = 0
+    moves = list(zip(DIRECTIONS, MOVE_COSTS))
+
+    open_set.add(start_index)
+    open_list.append((weight * h_of(start_index), count, 0, start_index))
+    count += 1
+
+    def over_budget():
+        if max_expansions is not None and expanded >= max_expansions:
+            return True
+        return deadline is not None and time.perf_counter() >= deadline
+
+    found = False
+    while True:
+        # ImprovePath: 도착점의 g가 열린 리스트의 최소 f 이하가 될 때까지 확장
+        while open_list:
+            f, _, current_g, current = open_list[0]
+            if current not in open_set or current_g != best_g[current]:
+                heapq.heappop(open_list) # 오래된 항목
+                continue
+            if end_index in best_g and best_g[end_index] <= f:
+                break
+            if found and over_budget():
+                record_search(expanded)
+                return
+
+            heapq.heappop(open_list)
+            open_set.discard(current)
+            closed.add(current)
+            expanded += 1
+
+            current_r, current_c = divmod(current, cols)
+            for (move_r, move_c), movement_cost in moves:
+                r = current_r + move_r
+                c = current_c + move_c
+                if r < 0 or r >= rows or c < 0 or c >= cols:
+                    continue
+
+                child = r * cols + c
+                if cells[child] == 1:
+                    continue
+
+                g = current_g + movement_cost
+                if child in best_g and g >= best_g[child]:
+                    continue
+                best_g[child] = g
+                parent[child] = current
+
+                if child in closed:
+                    incons.add(child)
+                else:
+                    open_set.add(child)
+                    heapq.heappush(open_list, (g + weight * h_of(child), count, g, child))
+                    count += 1
+
+        if end_index not in best_g:
+            record_search(expanded) # 경로 없음
+            return
+
+        # 지금 경로의 최적 비용 대비 배율 상한: g(도착점) / 열린 리스트와 INCONS의 min(g + h)
+        goal_g = best_g[end_index]
+        lower = min((best_g[index] + h_of(index) for index in open_set | incons), default=goal_g)
+        bound = min(weight, goal_g / lower) if lower > 0 else 1.0
+        bound = max(bound, 1.0)
+
+        found = True
+        yield build_path(parent, end_index, cols), bound
+
+        if bound <= 1.0 or over_budget():
+            record_search(expanded)
+            return
+
+        # 가중치를 줄이고, INCONS를 열린 리스트에 합친 뒤 새 가중치로 f를 다시 계산
+        weight = max(1.0, min(weight - weight_step, bound))
+        open_set |= incons
+        incons = set()
+        closed = set()
+        open_list = [(best_g[index] + weight * h_of(index), i, best_g[index], index) for i, index in enumerate(open_set)]
+        heapq.heapify(open_list)
+        count = len(open_list)
+
+def ara_cells(start, end, cells, rows, cols, heuristic_table=None, weight=3.0, weight_step=0.5,
+              max_expansions=None, time_limit=None):
+    # 예산 안에서 찾은 가장 좋은 (경로, 배율 상한)을 반환 (경로가 없으면 (None, None))
+    result = (None, None)
+    for result in iter_ara_cells(start, end, cells, rows, cols, heuristic_table, weight, weight_step,
+                                 max_expansions, time_limit):
+        pass
+    return result
+
+# --- 여러 (start, end) 쿼리를 프로세스 풀로 나눠서 처리 ---
+
+# 워커 프로세스마다 한 번만 열어두는 grid (mmap)
+_worker_grid = None
+
+def _init_worker(grid_path, rows, cols):
+    global _worker_grid
+    with open(grid_path, 'rb') as f:
+        cells = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _worker_grid = (cells, rows, cols)
+
+def _solve_chunk(chunk, mode):
+    cells, rows, cols = _worker_grid
+    return [(index, search_cells(start, end, cells, rows, cols, mode)) for index, (start, end) in chunk]
+
+def iter_astar_many(queries, grid, workers=None, mode='astar'):
+    # 쿼리들을 풀어서 끝나는 순서대로 (쿼리 번호, 경로)를 하나씩 내보냄
+    queries = list(queries)
+    if not queries:
+        return
+
+    cells, rows, cols = flatten_grid(grid)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # 워커 1개면 프로세스를 만들지 않고 현재 프로세스에서 바로 처리
+    if workers <= 1:
+        for index, (start, end) in enumerate(queries):
+            yield index, search_cells(start, end, cells, rows, cols, mode)
+        return
+
+    # grid를 uint8 바이트로 임시 파일에 한 번만 기록 -> 워커들은 mmap으로 공유 (쿼리마다 pickle 하지 않음)
+    fd, grid_path = tempfile.mkstemp(suffix='.grid')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(bytes(cells))
+        del cells
+
+        # 워커당 4묶음 정도로 나눠서 프로세스 간 통신 횟수를 줄임
+        indexed = list(enumerate(queries))
+        chunk_size = max(1, len(indexed) // (workers * 4))
+        chunks = [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(grid_path, rows, cols)) as pool:
+            futures = [pool.submit(_solve_chunk, chunk, mode) for chunk in chunks]
+            for future in as_completed(futures):
+                for result in future.result():
+                    yield result
+    finally:
+        os.remove(grid_path)
+
+def astar_many(queries, grid, workers=None, mode='astar'):
+    # 여러 쿼리의 경로를 입력 순서대로 리스트로 반환 (경로가 없으면 None)
+    queries = list(queries)
+    results = [None] * len(queries)
+    for index, path in iter_astar_many(queries, grid, workers, mode):
+        results[index] = path
+    return results
+
+if __name__ == "__main__":
+    # 미로의 왼쪽 위 -> 오른쪽 아래 질의로 단방향 / 양방향 탐색의 확장 노드 수 비교
+    import sys
+    import numpy as np
 
-    # while 루프가 끝날 때까지 경로를 못 찾으면 None 반환
-    return None
\ No newline at end of file
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'maze_grid.csv'
+    grid = np.loadtxt(csv_path, delimiter=',', dtype=int)
+    results = compare_bidirectional((0, 0), (len(grid) - 1, len(grid[0]) - 1), grid)
+    for mode, result in results.items():
+        print(f"{mode:>22}: 확장 노드 {result['expanded']}개, 경로 비용 {result['cost']}")
@@ -1,21 +1,31 @@
-import pygame
 import enum
 import numpy as np
-import math
 import A_star_BT
-from collections import deque
-import csv
-
-try:    
-    grid = np.loadtxt("maze_grid.csv", delimiter = ',', dtype = int)
-except FileNotFoundError:
-    print("오류: 'grid.csv' 파일을 찾을 수 없습니다. 경로를 확인해주세요.")
-    pygame.quit()
-    exit()
-except Exception as e:
-    print(f"오류: grid.csv 파일을 읽는 중 문제가 발생했습니다: {e}")
-    pygame.quit()
-    exit()
+import D_star_lite_BT
+import path_cache_BT
+import flow_field_BT
+import shared_map_BT
+import reservation_BT
+import agent_log_BT
+import grid_renderer_BT
+import scheduler_BT
+import field_of_view_BT
+import argparse
+import random
+import sys
+import time
+import maze_grid
+# pygame은 화면 모드에서만 run() 안에서 import (헤드리스 모드는 pygame 없이 실행)
+
+# False면 틱마다 찍던 진행 메시지를 출력하지 않음 (헤드리스 모드)
+verbose = True
+
+def log(*args):
+    if verbose:
+        print(*args)
+
+# 시뮬레이션할 실제 월드 (run()에서 불러옴)
+grid = None
 
 class Status(enum.Enum):
     SUCCESS = 1
@@ -23,9 +33,16 @@ class Status(enum.Enum):
     FAILED = 3
 
 class Agent:
-    def __init__(self, start_position):
+    def __init__(self, start_position, vision_radius = 2, line_of_sight = False, shared = None,
+                 agent_id = 0, reservations = None, path_cache = False):
         # AI의 현재 위치 (row, col)
         self.position = start_position
+
+        # 에이전트 번호 (여러 에이전트 모드에서는 작을수록 이동 우선순위가 높음)
+        self.agent_id = agent_id
+
+        # 여러 에이전트 모드의 이동 예약표 (None이면 혼자 실행: 행동 트리에서 바로 이동)
+        self.reservations = reservations
         
         # AI의 단기 기억 장소
         self.memory = {}
@@ -33,26 +50,80 @@ class Agent:
         # 현재 따라가고 있는 경로
         self.path = []
 
-        # 맵 전체를 미확인 상태로 복사
-        self.map = np.full_like(grid, 3)
+        # 탐험 지도와 프런티어, 월드 통계, 탈출 거리 지도 (shared를 주면 다른 에이전트와 같이 사용)
+        self.shared = shared if shared is not None else shared_map_BT.SharedMap(grid)
+        self.map = self.shared.map
+
+        # 지도가 바뀐 부분만 다시 계산하는 증분 경로 계획기 (D* Lite)
+        self.planner = D_star_lite_BT.DStarLite(self.map)
+        self.seen_changes = len(self.shared.changes) # 계획기에 반영한 바뀐 칸 수
+
+        # 지도 버전 (칸의 막힘 여부가 바뀔 때만 증가) 과 경로 캐시 (path_cache=True일 때만)
+        # 다시 계획하는 때는 거의 목표가 바뀌었거나 새 벽이 경로를 막았을 때라서 캐시가 맞는 일이 드묾
+        # (한 에이전트 실행 0%, 여러 에이전트는 밀려난 뒤 같은 목표로 다시 계획할 때만 맞음: 150명 각자 지도 약 16%)
+        self.map_version = 0
+        self.path_cache = path_cache_BT.PathCache(max_size = 256) if path_cache else None
+
+        # 프런티어(미탐험 칸과 맞닿은 알려진 길)와 미탐험 칸 수를 증분으로 관리
+        self.frontier = self.shared.frontier
+
+        # 탐험한 칸 수, 남은 아이템 수, 아이템 위치 인덱스
+        self.world = self.shared.world
+
+        # 시야 (반경, 벽에 가려지는지 여부)
+        self.view = field_of_view_BT.FieldOfView(vision_radius, line_of_sight)
+
+        # 행동 트리 실행 상태 (RUNNING 중인 노드, 노드별 결과)
+        self.blackboard = Blackboard()
 
         self.items_collected = 0
     
     def update_exploration_map(self, grid):
-        agent_r, agent_c = self.position
-        radius = 2 # 5x5 시야
-
-        for r in range(agent_r - radius, agent_r + radius + 1):
-            for c in range(agent_c - radius, agent_c + radius + 1):
-                # (r, c)가 grid 맵 범위 안에 있는지 확인
-                if 0 <= r < len(grid) and 0 <= c < len(grid[0]):
-                    # 실제 grid 값을 읽어서 map에 기록
-                    if grid[r][c] == 1: # 실제 벽이면
-                        self.map[r][c] = 1 # 내 지도에 '벽'으로 기록
-                    elif grid[r][c] == 0: # 길이면
-                        self.map[r][c] = 0 # 내 지도에 '길'로 기록
-                    elif grid[r][c] == 2: # 아이템이면
-                        self.map[r][c] = 2 # 내 지도에 '아이템'으로 기록
+        # 시야 안의 실제 grid 값을 내 지도에 기록하고, 값이 바뀐 칸 목록을 반환
+        changed, newly_explored = self.view.update(grid, self.map, self.position)
+
+        # 다른 구성 요소들에는 바뀐 칸만 알려줌
+        if changed:
+            self.shared.reveal(changed, newly_explored)
+
+        # 내 계획기에는 지도에서 아직 반영하지 않은 칸 (지도를 같이 쓰면 다른 에이전트가 본 칸도 포함)
+        changes = self.shared.changes
+        if len(changes) > self.seen_changes:
+            # 길/아이템/미탐험은 모두 지나갈 수 있으므로, 벽이 생기거나 사라진 칸이 있을 때만 캐시된 경로가 틀려짐
+            flipped = self.planner.update_cells(changes[self.seen_changes:])
+            if flipped:
+                self.map_version += 1
+                # 새로 벽이 된 칸뿐이면 그 칸을 지나는 경로만 버리고 나머지는 새 버전으로 옮김
+                if self.path_cache is not None and all(self.map[position] == 1 for position in flipped):
+                    self.path_cache.advance(self.map_version, flipped)
+            self.seen_changes = len(changes)
+        return changed
+
+class Blackboard():
+    # 에이전트마다 하나씩 갖는 행동 트리 실행 상태
+    # (에이전트가 기억하는 데이터는 agent.memory, 노드의 실행 상태는 여기에 저장)
+    def __init__(self):
+        self.tick = 0
+        self.running = {} # 복합 노드 -> RUNNING을 반환한 자식 번호
+        self.status = {}  # 이번 틱에 실행된 노드 -> 결과
+        self.running_leaf = None # CompiledTree용: RUNNING을 반환한 잎의 pc
+
+class BehaviorTree():
+    # 틱마다 트리를 딱 한 번 실행하는 런타임
+    def __init__(self, root):
+        self.root = root
+
+    def tick(self, agent):
+        blackboard = agent.blackboard
+        blackboard.tick += 1
+        blackboard.status = {} # 이번 틱에 실행된 노드만 기록 (실행된 가지에 비례하는 비용)
+        status = self.root.state(agent)
+        blackboard.status[self.root] = status
+        return status
+
+    def tick_many(self, agents):
+        # 에이전트마다 차례로 한 번씩 실행하고 결과 목록을 반환
+        return [self.tick(agent) for agent in agents]
 
 class BehaviorNode():
     def __init__(self, name = "Node"):
@@ -64,27 +135,204 @@ class BehaviorNode():
         
     def state(self):
         raise NotImplementedError
-    
+
+    def halt(self, blackboard):
+        # 실행 중이던 가지가 중단되면 그 아래의 실행 상태도 모두 지움
+        blackboard.running.pop(self, None)
+        for child in self.children:
+            child.halt(blackboard)
+
+    def set_running(self, blackboard, index, status):
+        # RUNNING인 자식을 기억하고, 이전에 실행 중이던 다른 자식은 중단
+        previous = blackboard.running.get(self)
+        if previous is not None and previous != index:
+            self.children[previous].halt(blackboard)
+        if status == Status.RUNNING:
+            blackboard.running[self] = index
+        elif previous is not None:
+            del blackboard.running[self]
+
 class Selector(BehaviorNode):
-    def __init__(self, name): # 자식도 이름 부여
+    # memory=True면 RUNNING이었던 자식부터 다시 시작
+    # memory=False면 매 틱 첫 자식부터 확인 (우선순위가 높은 행동이 끼어들 수 있음)
+    def __init__(self, name, memory = True): # 자식도 이름 부여
         super().__init__(name) # 부모에게도 이름을 전달하며 호출
+        self.memory = memory
     def state(self, agent):
-        for child in self.children:
+        blackboard = agent.blackboard
+        start = blackboard.running.get(self, 0) if self.memory else 0
+        for index in range(start, len(self.children)):
+            child = self.children[index]
             status = child.state(agent)
+            blackboard.status[child] = status
             if status != Status.FAILED:
+                self.set_running(blackboard, index, status)
                 return status
+        self.set_running(blackboard, None, Status.FAILED)
         return Status.FAILED
     
 class Sequence(BehaviorNode):
-    def __init__(self, name): # 자식도 이름 부여
+    # memory=True면 RUNNING이었던 자식부터 다시 시작 (앞의 조건은 다시 확인하지 않음)
+    def __init__(self, name, memory = True): # 자식도 이름 부여
         super().__init__(name) # 부모에게도 이름을 전달하며 호출
+        self.memory = memory
     def state(self, agent):
-        for child in self.children:
+        blackboard = agent.blackboard
+        start = blackboard.running.get(self, 0) if self.memory else 0
+        for index in range(start, len(self.children)):
+            child = self.children[index]
             status = child.state(agent)
+            blackboard.status[child] = status
             if status != Status.SUCCESS:
+                self.set_running(blackboard, index, status)
                 return status
+        self.set_running(blackboard, None, Status.SUCCESS)
         return Status.SUCCESS
     
+class CompiledTree():
+    # 트리를 미리 평평한 명령 배열로 바꿔서 실행하는 런타임 (BehaviorTree와 같은 결과)
+    # 잎 노드마다 번호(pc)를 붙이고, 잎의 결과(SUCCESS/FAILED/RUNNING)마다
+    # (끝나는 노드들, 다음에 들어갈 노드)를 미리 계산해둠
+    # -> 틱마다 복합 노드의 메서드 호출, children 순회, 실행 상태 딕셔너리 갱신이 없음
+    def __init__(self, root):
+        self.root = root
+        self.nodes = []   # 노드 번호 -> 노드
+        self.parent = {}  # 노드 -> (부모, 부모 안에서의 자식 번호)
+        self.leaves = []  # pc -> 잎 노드
+        self.number(root)
+
+        self.node_id = {node: i for i, node in enumerate(self.nodes)}
+        self.leaf_pc = {leaf: pc for pc, leaf in enumerate(self.leaves)}
+        self.funcs = [leaf.state for leaf in self.leaves]
+
+        # 잎의 결과별 다음 명령
+        self.on_success = [self.jump(leaf, Status.SUCCESS) for leaf in self.leaves]
+        self.on_failed = [self.jump(leaf, Status.FAILED) for leaf in self.leaves]
+        self.on_running = [self.jump(leaf, Status.RUNNING) for leaf in self.leaves]
+
+        # 각 노드로 들어갈 때 실행할 첫 pc (RUNNING이었던 잎이 없을 때)
+        self.first = [self.entry(node, None) for node in self.nodes]
+        # 지난 틱에 RUNNING이었던 잎(pc, 없으면 None)마다 첫 pc가 달라지는 노드만 따로 기억
+        # (memory가 있는 그 잎의 조상들뿐이라 잎 수 x 트리 깊이 크기)
+        self.resume = {None: {}}
+        for pc in range(len(self.leaves)):
+            self.resume[pc] = self.resume_targets(pc)
+
+    def number(self, node):
+        self.nodes.append(node)
+        if not node.children:
+            self.leaves.append(node)
+        for index, child in enumerate(node.children):
+            self.parent[child] = (node, index)
+            self.number(child)
+
+    def contains(self, node, leaf):
+        while leaf is not None:
+            if leaf is node:
+                return True
+            leaf = self.parent.get(leaf, (None,))[0]
+        return False
+
+    def entry(self, node, running):
+        # memory가 있는 복합 노드는 RUNNING이었던 잎을 포함한 자식부터 다시 시작
+        running_leaf = None if running is None else self.leaves[running]
+        while node.children:
+            start = node.children[0]
+            if node.memory and running_leaf is not None and self.contains(node, running_leaf):
+                start = next(child for child in node.children if self.contains(child, running_leaf))
+            node = start
+        return self.leaf_pc[node]
+
+    def resume_targets(self, running):
+        # running 잎의 조상 중에서 다시 들어갈 때 첫 pc가 기본값과 다른 노드 번호 -> pc
+        targets = {}
+        node = self.leaves[running]
+        while node in self.parent:
+            node = self.parent[node][0]
+            node_id = self.node_id[node]
+            pc = self.entry(node, running)
+            if pc != self.first[node_id]:
+                targets[node_id] = pc
+        return targets
+
+    def jump(self, leaf, status):
+        # 잎이 status를 반환했을 때 같이 끝나는 노드들과, 다음에 들어갈 노드 번호 (트리가 끝나면 None)
+        finished = [leaf]
+        node = leaf
+        while node in self.parent:
+            parent, index = self.parent[node]
+            has_next = index + 1 < len(parent.children)
+            if has_next and status == Status.SUCCESS and isinstance(parent, Sequence):
+                return tuple(finished), self.node_id[parent.children[index + 1]]
+            if has_next and status == Status.FAILED and isinstance(parent, Selector):
+                return tuple(finished), self.node_id[parent.children[index + 1]]
+            finished.append(parent)
+            node = parent
+        return tuple(finished), None
+
+    def tick(self, agent):
+        blackboard = agent.blackboard
+        blackboard.tick += 1
+        statuses = blackboard.status = {}
+
+        resume = self.resume[blackboard.running_leaf]
+        first = self.first
+        funcs = self.funcs
+        pc = resume.get(0, first[0])
+        while True:
+            status = funcs[pc](agent)
+            if status is Status.SUCCESS:
+                finished, next_node = self.on_success[pc]
+            elif status is Status.FAILED:
+                finished, next_node = self.on_failed[pc]
+            else:
+                finished, next_node = self.on_running[pc]
+            for node in finished:
+                statuses[node] = status
+            if next_node is None:
+                break
+            pc = resume.get(next_node, first[next_node])
+
+        # 실행 상태는 RUNNING인 잎 하나로 충분 (그 조상들이 곧 RUNNING인 복합 노드들)
+        blackboard.running_leaf = pc if status is Status.RUNNING else None
+        return status
+
+    def tick_many(self, agents):
+        # 여러 에이전트를 한 틱씩 실행하고 결과 목록을 반환
+        # 같은 잎(pc)에 도착한 에이전트끼리 모아서 잎 하나를 묶음 단위로 실행
+        # pc는 트리 순서로만 커지므로 가장 작은 pc의 묶음부터 처리하면 모든 에이전트가 한 번씩 끝남
+        # 묶음 안에서는 원래 에이전트 순서대로 실행하지만, 잎 실행 순서는 에이전트마다 tick()한 것과 다름
+        # -> 잎이 다른 에이전트와 같이 쓰는 상태(같이 쓰는 지도, grid의 아이템)를 바꾸면 결과가 달라질 수 있음
+        first = self.first
+        results = [None] * len(agents)
+        groups = {} # pc -> 그 잎을 실행할 에이전트 번호 목록
+        for i, agent in enumerate(agents):
+            blackboard = agent.blackboard
+            blackboard.tick += 1
+            blackboard.status = {}
+            groups.setdefault(self.resume[blackboard.running_leaf].get(0, first[0]), []).append(i)
+
+        while groups:
+            pc = min(groups)
+            func = self.funcs[pc]
+            jumps = {Status.SUCCESS: self.on_success[pc], Status.FAILED: self.on_failed[pc],
+                     Status.RUNNING: self.on_running[pc]}
+            for i in sorted(groups.pop(pc)):
+                agent = agents[i]
+                blackboard = agent.blackboard
+                status = func(agent)
+                finished, next_node = jumps[status]
+                statuses = blackboard.status
+                for node in finished:
+                    statuses[node] = status
+                if next_node is None:
+                    blackboard.running_leaf = pc if status is Status.RUNNING else None
+                    results[i] = status
+                else:
+                    resume = self.resume[blackboard.running_leaf]
+                    groups.setdefault(resume.get(next_node, first[next_node]), []).append(i)
+        return results
+
 class IsItemInMemory(BehaviorNode):
     def state(self, agent):
         if 'target_item' in agent.memory:
@@ -110,17 +358,26 @@ class MoveToItem(BehaviorNode):
         target_pos = agent.memory.get('target_item')
 
         if not target_pos: return Status.FAILED
-        
+
+        if agent.position != target_pos and not agent.world.has_item(target_pos):
+            # 가는 도중에 다른 에이전트가 먼저 주운 아이템 -> 기억을 지우고 다른 행동을 고르게 함
+            agent.memory.pop('target_item', None)
+            agent.memory.pop('current_target', None)
+            agent.path = []
+            return Status.FAILED
+
         if agent.position == target_pos:
-            print(f"아이템 획득! 위치: {target_pos}")
+            log(f"아이템 획득! 위치: {target_pos}")
             # 아이템 획득 (grid에서 아이템 제거)
             if 0 <= target_pos[0] < len(grid) and 0 <= target_pos[1] < len(grid[0]):
                  if grid[target_pos[0]][target_pos[1]] == 2: # 해당 위치가 아이템이면
                       grid[target_pos[0]][target_pos[1]] = 0 # 길(0)으로 변경 (줍기)
                       agent.items_collected += 1
-                      print("맵에서 아이템 제거 완료.")
+                      agent.world.remove_item(target_pos)
+                      log("맵에서 아이템 제거 완료.")
                  else:
-                      print("경고: 목표 위치에 아이템이 없습니다.")
+                      log("경고: 목표 위치에 아이템이 없습니다.")
+                      agent.world.remove_item(target_pos) # 다른 에이전트가 먼저 주운 아이템
 
             # 기억 지우기
             agent.memory.pop('target_item', None)
@@ -137,8 +394,8 @@ class MoveToItem(BehaviorNode):
         
 class IsUnexploredArea(BehaviorNode):
     def state(self, agent):
-        # agent의 탐험 지도에 0 (미탐험)이 하나라도 존재하는지 확인
-        if np.any(agent.map == 3):
+        # agent의 탐험 지도에 3 (미탐험)이 하나라도 존재하는지 확인 (미탐험 칸 수로 O(1) 확인)
+        if agent.frontier.has_unknown():
             return Status.SUCCESS # "미개척지가 존재한다" -> 성공
         else:
             return Status.FAILED # "미개척지가 없다" -> 실패
@@ -148,42 +405,10 @@ class NearestUnexploredArea(BehaviorNode):
         if 'exploration_target' in agent.memory:
             return Status.SUCCESS
 
-        queue = deque([agent.position])
-        visited = {agent.position}
-
-        while queue:
-            current_pos = queue.popleft()
-
-            # 현재 위치(current_pos)의 8방향 이웃을 탐색
-            for move_x in range(-1, 2): 
-                for move_y in range(-1, 2):
-                    if move_x == 0 and move_y == 0:
-                        continue # 자기 자신 제외
-
-                    next_pos = (current_pos[0] + move_x, current_pos[1] + move_y)
-
-                    # 맵 범위 확인
-                    if not (0 <= next_pos[0] < len(agent.map) and 0 <= next_pos[1] < len(agent.map[0])):
-                        continue
-                    
-                    # 이미 방문한 곳인지 확인
-                    if next_pos in visited:
-                        continue
-
-                    neighbor_tile = agent.map[next_pos[0]][next_pos[1]]
-
-                    # '미탐험(3)' 구역인가?
-                    if neighbor_tile == 3:
-                        agent.memory['exploration_target'] = next_pos
-                        return Status.SUCCESS
-
-                    # '알려진 길(0)' 또는 '아이템(2)'인가?
-                    if neighbor_tile in [0, 2]:
-                        # '알려진 길'이라면, 계속 탐색하기 위해 큐에 추가
-                        visited.add(next_pos)
-                        queue.append(next_pos)
+        if choose_exploration_target(agent) is not None:
+            return Status.SUCCESS
 
-        # 큐가 비었는데도 '3'을 못 찾음 (모든 맵 탐험 완료)
+        # 도달할 수 있는 '3'이 없음 (모든 맵 탐험 완료)
         return Status.FAILED
 
 class Exploration(BehaviorNode):
@@ -191,11 +416,13 @@ class Exploration(BehaviorNode):
         target_pos = agent.memory.get('exploration_target')
         if not target_pos: return Status.FAILED # 목표 없으면 실패 추가
 
-        if agent.position == target_pos:
-            print(f"탐험 목표 도달! 위치: {target_pos}")
+        # 여러 에이전트: 목표 칸이 시야에 들어오면 도달한 것으로 침 (그 칸에 다른 에이전트가 서 있을 수 있음)
+        if agent.position == target_pos or (agent.reservations is not None and agent.map[target_pos[0]][target_pos[1]] != 3):
+            log(f"탐험 목표 도달! 위치: {target_pos}")
             # 기억 삭제
             agent.memory.pop('exploration_target', None)
             agent.memory.pop('current_target', None) # 이동 목표도 함께 제거
+            agent.memory.pop('avoid', None)
             agent.path = [] # 현재 경로도 초기화
             return Status.SUCCESS # 성공 반환
         else:
@@ -207,70 +434,88 @@ class Exploration(BehaviorNode):
                  agent.memory.pop('exploration_target', None)
                  agent.memory.pop('current_target', None)
                  agent.path = []
+                 if 'avoid' in agent.memory and choose_exploration_target(agent) is not None:
+                     # 여러 에이전트: 오래 막혀서 버린 목표 대신 바로 다른 목표를 고르고 이번 틱은 기다림
+                     # (실패로 끝내면 탈출 노드가 탐험을 마치지 않은 에이전트를 탈출 지점 쪽으로 움직임)
+                     return Status.RUNNING
                  return Status.FAILED
 
+def choose_exploration_target(agent):
+    # 알려진 길로 이어진 가장 가까운 '미탐험(3)' 칸 (프런티어 집합 사용)을 탐험 목표로 정하고 반환 (없으면 None)
+    # 다른 에이전트에게 오래 막혔던 칸 너머는 다른 곳을 다 본 뒤에 다시 감
+    target = agent.frontier.nearest_unknown(agent.position, agent.memory.get('avoid'))
+    if target is None and agent.memory.pop('avoid', None) is not None:
+        target = agent.frontier.nearest_unknown(agent.position)
+    if target is not None:
+        agent.memory['exploration_target'] = target
+    return target
+
 class Exit(BehaviorNode):
     def state(self, agent):
         end_point = agent.memory.get('end_point')
         
+        # 탐험이나 아이템으로 가다 막혔던 칸 기억은 탈출에는 쓰지 않음
+        agent.memory.pop('avoid', None)
+
         if agent.position != end_point:
-            move_one_step(agent, end_point)
+            # 도착점이 고정이므로 A*를 다시 하지 않고 거리 지도를 따라 한 칸 이동
+            shared = agent.shared
+            if shared.exit_field is None or shared.exit_field.goal != end_point:
+                shared.exit_field = flow_field_BT.FlowField(agent.map, end_point)
+            if agent.reservations is not None:
+                agent.reservations.request(agent, shared.exit_field.descent(agent.position, agent.reservations.window))
+                return Status.RUNNING
+            next_pos = shared.exit_field.next_step(agent.position)
+            if next_pos is not None:
+                agent.position = next_pos
             return Status.RUNNING
         else:
             return Status.SUCCESS
 
 def find_item_in_sight(agent, grid):
-    agent_r, agent_c = agent.position # agent.position row, column 할당
-    
-    radius = 2 # 5*5 반경 설정
-
-    nearest_item_pos = None
-    min_distance = math.inf
-
-    for r in range(agent_r - radius, agent_r + radius + 1):
-        for c in range(agent_c - radius, agent_c + radius + 1):
-
-            # (r, c)가 grid 맵 범위 안에 있는지 확인
-            if 0 <= r < len(grid) and 0 <= c < len(grid[0]):
-                # 현재 칸이 아이템(2)인지 확인
-                if grid[r][c] == 2:
-                    # 거리 계산
-                    distance = abs(agent_r - r) + abs(agent_c - c)
-
-                    if distance < min_distance:
-                        min_distance = distance
-                        nearest_item_pos = (r, c)
+    radius = agent.view.radius # 시야 반경과 같게 설정 (기본 2: 5*5)
 
-    return nearest_item_pos
+    # 시야 창과 겹치는 아이템 버킷만 확인 (가장 가까운 아이템, 같은 거리면 행/열 순서)
+    return agent.world.nearest_item(agent.position, radius)
 
 def get_current_state_for_logging(agent):
-    # 현재 에이전트의 행동과 목표를 문자열로 반환
+    # 현재 에이전트의 행동(문자열)과 목표 위치(없으면 None)를 반환
     
     # 1순위: 탈출
-    # np.any(grid == 2)는 "맵에 2(아이템)가 하나라도 있는가?"
-    if not np.any(grid == 2):
-        return "Escaping", str(agent.memory.get('end_point'))
+    # 맵에 2(아이템)가 하나라도 남아 있는가? (남은 아이템 수로 O(1) 확인)
+    if not agent.world.has_items():
+        return "Escaping", agent.memory.get('end_point')
 
     # 2순위: 아이템 획득
     if 'target_item' in agent.memory:
-        return "MoveToItem", str(agent.memory.get('target_item'))
+        return "MoveToItem", agent.memory.get('target_item')
 
     # 3순위: 탐험
     if 'exploration_target' in agent.memory:
-        return "Exploring", str(agent.memory.get('exploration_target'))
+        return "Exploring", agent.memory.get('exploration_target')
         
     # 4순위: 결정 중 또는 유휴 상태
-    return "Idle/Deciding", "None"
+    return "Idle/Deciding", None
 
 def move_one_step(agent, target_pos):
     # 경로가 비었거나, 기억된 목표와 현재 목표가 다르면 경로 재계산
     if not agent.path or agent.memory.get('current_target') != target_pos:
-        print("agent.position:", agent.position)
-        print("target:", agent.memory.get('exploration_target'))
-        print("end_point:", agent.memory.get('end_point'))
+        log("agent.position:", agent.position)
+        log("target:", agent.memory.get('exploration_target'))
+        log("end_point:", agent.memory.get('end_point'))
         
-        # A* 호출
-        new_path = A_star_BT.astar(agent.position, target_pos, agent.map)
+        # 같은 지도 버전에서 계산한 경로가 캐시에 있으면 재사용
+        new_path = None
+        if agent.path_cache is not None:
+            new_path = agent.path_cache.get(agent.position, target_pos, agent.map_version)
+        if 'avoid' in agent.memory:
+            # 여러 에이전트: 오래 막혔던 칸은 돌아가는 경로 (돌아갈 길이 없으면 원래 경로)
+            new_path = agent.planner.plan_around(agent.position, target_pos, agent.memory['avoid']) or new_path
+        if new_path is None:
+            # 증분 경로 계획 (바뀐 칸 주변만 다시 계산)
+            new_path = agent.planner.plan(agent.position, target_pos)
+            if new_path and agent.path_cache is not None:
+                agent.path_cache.put(agent.position, target_pos, agent.map_version, new_path)
 
         if new_path:
             # 첫 번째는 현재 위치이므로 제외하고 경로 저장
@@ -289,10 +534,20 @@ def move_one_step(agent, target_pos):
         # 2. 다음 위치가 현재 맵에서 벽(1)인지 확인
         if agent.map[next_pos[0]][next_pos[1]] == 1:
             # 3. 벽이라면, 현재 경로는 더 이상 유효하지 않음
-            print(f"경로가 막힘! {next_pos}는 벽입니다. 경로를 재탐색합니다.")
+            log(f"경로가 막힘! {next_pos}는 벽입니다. 경로를 재탐색합니다.")
             agent.path = [] # 경로 비우기
             agent.memory.pop('current_target', None) # 목표 비우기
             return False # 이동 실패 (-> 다음 틱에서 재계산 유도)
+        if agent.reservations is not None:
+            # 여러 에이전트: 틱 끝에 예약표가 우선순위대로 이동시킴 (막히면 경로를 그대로 두고 기다림)
+            if agent.reservations.stuck(agent):
+                # 오래 막혀 있으면 이동 실패로 처리해서 막힌 칸을 돌아가는 다른 목표를 고르게 함
+                agent.memory['avoid'] = next_pos
+                agent.path = []
+                agent.memory.pop('current_target', None)
+                return False
+            agent.reservations.request(agent, agent.path)
+            return True
         # 경로 리스트에서 다음 위치를 하나 꺼냄
         next_pos = agent.path.pop(0)
         agent.position = next_pos
@@ -301,7 +556,8 @@ def move_one_step(agent, target_pos):
         return False # 이동할 경로 없음
 
 # 루트 노드 생성
-root = Selector("최상위 의사결정")
+# 우선순위 선택이므로 매 틱 처음부터 확인 (탐험 중에도 아이템을 발견하면 끼어듦)
+root = Selector("최상위 의사결정", memory = False)
 
 # 1순위: '기억된' 아이템 획득 절차
 memory_item_sequence = Sequence("기억된 아이템 획득")
@@ -328,110 +584,295 @@ root.add_child(find_item_sequence)   # 2순위
 root.add_child(explore_sequence)     # 3순위
 root.add_child(escape_action)        # 4순위
 
-# --- Pygame 초기화 및 설정 ---
-pygame.init()
+behavior_tree = BehaviorTree(root)
+compiled_tree = CompiledTree(root)
+
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-clock = pygame.time.Clock()
 CELL_SIZE = 10
 
 BLACK = (0, 0, 0)
 
-csv_headers = ['Tick', 'Position_Row', 'Position_Col', 'Current_Action', 'Target', 'Node_Status', 'Items_Collected', 'Exploration_Percent']
-try:
-    csv_file = open('agent_log.csv', 'w', newline='', encoding='utf-8')
-    writer = csv.writer(csv_file)
-    writer.writerow(csv_headers)
-    print("'agent_log.csv' 파일이 열렸습니다. 로깅을 시작합니다.")
-except IOError as e:
-    print(f"CSV 파일 열기 오류: {e}")
-    # 파일 열기에 실패하면 csv_file 변수가 생성되지 않음
-    csv_file = None
-
-# --- 에이전트 생성 ---
-start_pos = (0, 0) # 시작 위치
-my_agent = Agent(start_position = start_pos)
-# 탈출 지점 메모리에 저장
-my_agent.memory['end_point'] = (len(grid) - 1, len(grid[0]) - 1)
-
-# --- 메인 게임 루프 ---
-running = True
-tick_count = 0
-
-while running:
-    # 이벤트 처리
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    # 1. 에이전트의 시야에 따라 탐험 지도 업데이트
-    my_agent.update_exploration_map(grid)
-    
-    # 2. 행동 트리 실행
-    root.state(my_agent)
-
-    status = root.state(my_agent)
-
-    if my_agent.position == my_agent.memory.get('end_point'):
+def run(headless = False, log_path = 'agent_log.csv', max_ticks = None, maze = "maze_grid.csv",
+        vision_radius = 2, line_of_sight = False, compiled = False, ticks_per_second = 100, fps = 60):
+    # 시뮬레이션 한 번 실행 후 요약(틱 수, 아이템, 탐험 %, 걸린 시간, 초당 틱)을 반환
+    # headless=True면 pygame을 import하지 않고, 화면 그리기와 속도 제한 없이 최대한 빨리 실행
+    # maze: 미로 파일 경로 또는 이미 만들어진 grid 배열
+    # compiled=True면 평평하게 컴파일한 트리로 실행 (결과는 같음)
+    # ticks_per_second: 화면 모드의 시뮬레이션 속도 (None이면 최대 속도), fps: 화면을 그리는 속도
+    global verbose, grid
+    grid = maze_grid.load_grid(maze) if isinstance(maze, str) else np.asarray(maze)
+
+    # 경로 탐색 통계 초기화
+    A_star_BT.search_stats.update(calls = 0, expanded = 0, last_expanded = 0)
+
+    if headless:
+        verbose = False
+    else:
+        import pygame
+
+        # --- Pygame 초기화 및 설정 ---
+        pygame.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        scheduler = scheduler_BT.FixedTimestep(ticks_per_second, fps)
+        screen.fill(BLACK)
+        pygame.display.update()
+        renderer = grid_renderer_BT.GridRenderer(len(grid), len(grid[0]), CELL_SIZE, grid_renderer_BT.AGENT_PALETTE)
+
+    # 틱별 로그 (.bin이면 열 단위 바이너리 로그, 아니면 CSV)
+    agent_log = None
+    if log_path:
+        try:
+            agent_log = agent_log_BT.open_log(log_path, grid.size)
+            log(f"'{log_path}' 파일이 열렸습니다. 로깅을 시작합니다.")
+        except IOError as e:
+            print(f"로그 파일 열기 오류: {e}")
+            # 파일 열기에 실패하면 로그 없이 진행
+            agent_log = None
+
+    # --- 에이전트 생성 ---
+    start_pos = (0, 0) # 시작 위치
+    my_agent = Agent(start_position = start_pos, vision_radius = vision_radius, line_of_sight = line_of_sight)
+    # 탈출 지점 메모리에 저장
+    my_agent.memory['end_point'] = (len(grid) - 1, len(grid[0]) - 1)
+
+    tree = compiled_tree if compiled else behavior_tree
+
+    # --- 메인 게임 루프 ---
+    running = True
+    escaped = False
+    tick_count = 0
+    start_time = time.perf_counter()
+
+    def draw_frame():
+        # 탐험 지도, 아이템, 에이전트를 팔레트 번호 배열로 만들고 바뀐 부분만 다시 그림
+        grid_renderer_BT.compose_agent_view(renderer.cells, my_agent.map, grid, my_agent.position)
+        rects = renderer.draw(screen)
+        rects.append(scheduler.draw_counters(screen, (len(grid[0]) * CELL_SIZE + 10, 10)))
+        pygame.display.update(rects)
+        scheduler.frame_done()
+
+    while running:
+        if headless:
+            due_ticks = (None,) # 헤드리스는 그리기 없이 한 바퀴에 한 틱
+        else:
+            # 이벤트 처리
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+            # 틱과 프레임은 스케줄러가 따로 정함 (밀리면 틱 대신 프레임을 건너뜀)
+            due_ticks = scheduler.due_ticks()
+
+        for _ in due_ticks:
+            # 1. 에이전트의 시야에 따라 탐험 지도 업데이트
+            my_agent.update_exploration_map(grid)
+
+            # 2. 행동 트리 실행 (틱마다 한 번)
+            status = tree.tick(my_agent)
+
+            if my_agent.position == my_agent.memory.get('end_point'):
+                escaped = True
+                running = False        # 메인 루프 종료 플래그 설정
+
+            if agent_log:
+                # 현재 상태 가져오기 (문자열 변환은 CSV로 쓸 때만 함)
+                r, c = my_agent.position
+                action, target = get_current_state_for_logging(my_agent)
+
+                # 탐험률은 탐험한 칸 수로 기록 (탐험된 타일 수 / 전체 타일 수) * 100
+                agent_log.append(tick_count, r, c, action, target, status.name, my_agent.items_collected,
+                                 my_agent.world.explored_count)
+
+            tick_count += 1
+            if max_ticks is not None and tick_count >= max_ticks:
+                running = False
+            if not running:
+                break
+
+        if headless:
+            continue
+
+        # --- 화면 그리기 ---
+        if scheduler.should_render():
+            draw_frame()
+        scheduler.wait()
+
+    if escaped and not headless:
+        scheduler.should_render()
+        draw_frame()
         print("탈출 성공! 3초 후 프로그램을 종료합니다.")
         pygame.time.wait(3000) # 3초 대기 (성공 확인용)
-        running = False        # 메인 루프 종료 플래그 설정
 
-    if csv_file: 
-        # 1. 현재 상태 가져오기
-        r, c = my_agent.position
-        action, target = get_current_state_for_logging(my_agent)
-        
-        # 추가 데이터 계산
-        status_name = status.name
-        items_count = my_agent.items_collected
-        
-        # (탐험된 타일 수 / 전체 타일 수) * 100
-        explored_count = np.count_nonzero(my_agent.map != 3)
-        total_tiles = my_agent.map.size
-        explore_percent = (explored_count / total_tiles) * 100
-        
-        # 2. 데이터 한 줄로 만들기 (새 항목 추가)
-        data_row = [tick_count, r, c, action, target, status_name, items_count, f"{explore_percent:.2f}%"]
-        
-        # 3. 파일에 쓰기
-        writer.writerow(data_row)
-    
-    tick_count += 1
-
-    # --- 화면 그리기 ---
-    screen.fill(BLACK)
-
-    # 탐험 지도 그리기
-    for r in range(len(my_agent.map)):
-        for c in range(len(my_agent.map[0])):
-            rect = (CELL_SIZE * c, CELL_SIZE * r, CELL_SIZE, CELL_SIZE)
-            value = my_agent.map[r][c]
-            if value == 1: # 벽
-                pygame.draw.rect(screen, (128, 128, 128), rect)
-            elif value == 0: # 탐험된 길
-                 pygame.draw.rect(screen, (255, 255, 255), rect) # 약간 어둡게
-            # value == 3 (미탐험) 은 그냥 검은색 배경
-
-    # 아이템 그리기
-    for r in range(len(grid)):
-         for c in range(len(grid[0])):
-             if grid[r][c] == 2: # 아이템이면
-                 rect = (CELL_SIZE * c, CELL_SIZE * r, CELL_SIZE, CELL_SIZE)
-                 pygame.draw.rect(screen, (0, 255, 0), rect) # 초록색으로
-
-    # 에이전트 그리기
-    agent_r, agent_c = my_agent.position
-    agent_rect = (CELL_SIZE * agent_c, CELL_SIZE * agent_r, CELL_SIZE, CELL_SIZE)
-    pygame.draw.rect(screen, (255, 0, 0), agent_rect) # 빨간색으로
-
-    pygame.display.update()
-    clock.tick(100) # 속도 조절
-
-# --- 루프 종료 후 파일 닫기 ---
-if csv_file:
-    csv_file.close()
-    print("로그 파일 'agent_log.csv' 저장 완료.")
-
-pygame.quit()
+    wall_time = time.perf_counter() - start_time
+
+    # --- 루프 종료 후 파일 닫기 ---
+    if agent_log:
+        agent_log.close()
+        log(f"로그 파일 '{log_path}' 저장 완료.")
+
+    if not headless:
+        pygame.quit()
+
+    return {
+        'ticks': tick_count,
+        'escaped': escaped,
+        'items_collected': my_agent.items_collected,
+        'exploration_percent': my_agent.world.explored_percent(),
+        'wall_time': wall_time,
+        'ticks_per_sec': tick_count / wall_time if wall_time > 0 else 0.0,
+        'search_calls': A_star_BT.search_stats['calls'],
+        'nodes_expanded': A_star_BT.search_stats['expanded'],
+    }
+
+def run_agents(agent_count, shared_map = True, maze = "maze_grid.csv", max_ticks = 1000, vision_radius = 2,
+               line_of_sight = False, compiled = False, window = 4, seed = 0, path_cache = False):
+    # 여러 에이전트를 같은 grid에서 헤드리스로 실행하고 요약을 반환
+    # shared_map=True면 모든 에이전트가 탐험 지도를 같이 씀 (한 에이전트가 본 칸을 모두가 앎)
+    # 이동은 예약표가 틱 끝에 에이전트 번호 순서대로 충돌 없이 정함 (window: 미리 예약하는 틱 수)
+    # compiled=True면 같은 잎에 있는 에이전트끼리 묶어서 행동 트리를 실행
+    # (잎 실행 순서가 에이전트별 실행과 달라서, 같이 쓰는 지도나 아이템 때문에 결과가 조금 다를 수 있음)
+    global verbose, grid
+    grid = maze_grid.load_grid(maze) if isinstance(maze, str) else np.asarray(maze)
+    verbose = False
+    A_star_BT.search_stats.update(calls = 0, expanded = 0, last_expanded = 0)
+
+    rows, cols = len(grid), len(grid[0])
+    end_point = (rows - 1, cols - 1)
+
+    # 첫 에이전트는 한 에이전트 실행과 같은 (0, 0), 나머지는 시드로 섞은 빈 칸에서 시작
+    free = [position for position in map(tuple, np.argwhere(grid != 1).tolist())
+            if position != (0, 0) and position != end_point]
+    if agent_count - 1 > len(free):
+        raise ValueError(f"에이전트 수({agent_count})가 시작할 수 있는 칸 수({len(free) + 1})보다 많습니다.")
+    random.Random(seed).shuffle(free)
+    starts = [(0, 0)] + free[:agent_count - 1]
+
+    reservations = reservation_BT.ReservationTable(rows, cols, window)
+    shared = shared_map_BT.SharedMap(grid) if shared_map else None
+    agents = []
+    for agent_id, start_pos in enumerate(starts):
+        agent = Agent(start_pos, vision_radius, line_of_sight, shared = shared, agent_id = agent_id,
+                      reservations = reservations, path_cache = path_cache)
+        agent.memory['end_point'] = end_point
+        agents.append(agent)
+
+    tree = compiled_tree if compiled else behavior_tree
+
+    active = agents
+    tick_count = 0
+    agent_ticks = 0
+    collisions = 0
+    start_time = time.perf_counter()
+
+    while active and tick_count < max_ticks:
+        # 1. 모든 에이전트의 시야 갱신 (지도를 같이 쓰면 먼저 본 에이전트의 결과를 나머지도 바로 씀)
+        for agent in active:
+            agent.update_exploration_map(grid)
+
+        # 2. 행동 트리를 에이전트 전체에 한 번 실행 (이동은 요청만)
+        tree.tick_many(active)
+
+        # 3. 예약표가 이동 요청을 우선순위대로 처리
+        before = {agent.agent_id: agent.position for agent in active}
+        reservations.resolve(active)
+
+        # 같은 칸에 두 에이전트가 있거나 두 에이전트가 서로 자리를 바꾸면 예약표 오류 (검사용으로 셈)
+        collisions += len(active) - len({agent.position for agent in active})
+        moved_from = {before[agent.agent_id]: agent.position for agent in active
+                      if agent.position != before[agent.agent_id]}
+        collisions += sum(1 for source, target in moved_from.items() if moved_from.get(target) == source) // 2
+
+        agent_ticks += len(active)
+        tick_count += 1
+        active = [agent for agent in active if agent.position != end_point] # 탈출한 에이전트는 제외
+
+    wall_time = time.perf_counter() - start_time
+
+    if shared_map:
+        exploration_percent = shared.world.explored_percent()
+    else:
+        exploration_percent = sum(agent.world.explored_percent() for agent in agents) / len(agents)
+
+    summary = {
+        'agents': agent_count,
+        'shared_map': shared_map,
+        'ticks': tick_count,
+        'escaped': agent_count - len(active),
+        'items_collected': sum(agent.items_collected for agent in agents),
+        'exploration_percent': exploration_percent,
+        'wall_time': wall_time,
+        'ticks_per_sec': tick_count / wall_time if wall_time > 0 else 0.0,
+        'agent_ticks_per_sec': agent_ticks / wall_time if wall_time > 0 else 0.0,
+        'moves': reservations.moves,
+        'waits': reservations.waits,
+        'pushes': reservations.pushes,
+        'collisions': collisions,
+        'search_calls': A_star_BT.search_stats['calls'],
+        'nodes_expanded': A_star_BT.search_stats['expanded'],
+    }
+    if path_cache:
+        # 모든 에이전트의 경로 캐시 통계 합계
+        summary['path_cache'] = {name: sum(agent.path_cache.stats()[name] for agent in agents)
+                                 for name in ('hits', 'suffix_hits', 'misses')}
+    return summary
+
+def print_agents_summary(summary):
+    print(f"에이전트 {summary['agents']}명 ({'공유 지도' if summary['shared_map'] else '각자 지도'}): "
+          f"{summary['ticks']}틱, 탈출 {summary['escaped']}명")
+    print(f"획득한 아이템: {summary['items_collected']}, 탐험률: {summary['exploration_percent']:.2f}%")
+    print(f"걸린 시간: {summary['wall_time']:.3f}초 ({summary['ticks_per_sec']:.1f} ticks/sec, "
+          f"{summary['agent_ticks_per_sec']:.0f} agent-ticks/sec)")
+    print(f"이동 {summary['moves']}회, 대기 {summary['waits']}회, 밀려남 {summary['pushes']}회, 충돌 {summary['collisions']}회")
+    print(f"경로 탐색: {summary['search_calls']}회, 확장 노드 {summary['nodes_expanded']}개")
+    if 'path_cache' in summary:
+        cache = summary['path_cache']
+        lookups = cache['hits'] + cache['suffix_hits'] + cache['misses']
+        print(f"경로 캐시: 적중 {cache['hits']}회, 뒷부분 적중 {cache['suffix_hits']}회, 실패 {cache['misses']}회 "
+              f"(적중률 {100 * (cache['hits'] + cache['suffix_hits']) / lookups if lookups else 0:.1f}%)")
+
+def print_summary(summary):
+    print(f"틱 수: {summary['ticks']} (탈출 {'성공' if summary['escaped'] else '실패'})")
+    print(f"획득한 아이템: {summary['items_collected']}")
+    print(f"탐험률: {summary['exploration_percent']:.2f}%")
+    print(f"걸린 시간: {summary['wall_time']:.3f}초 ({summary['ticks_per_sec']:.1f} ticks/sec)")
+    print(f"경로 탐색: {summary['search_calls']}회, 확장 노드 {summary['nodes_expanded']}개")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="행동 트리 에이전트 미로 탈출 시뮬레이션")
+    parser.add_argument('--headless', action='store_true', help="pygame 없이 최대 속도로 실행하고 요약만 출력")
+    parser.add_argument('--log', default='agent_log.csv', help="틱별 로그 경로 (.bin이면 바이너리 로그, '' 이면 로그 안 남김)")
+    parser.add_argument('--max-ticks', type=int, default=None)
+    parser.add_argument('--vision-radius', type=int, default=2, help="시야 반경 (기본 2: 5x5)")
+    parser.add_argument('--line-of-sight', action='store_true', help="벽 뒤는 보이지 않는 시야 (shadowcasting)")
+    parser.add_argument('--compiled', action='store_true', help="컴파일한 행동 트리로 실행")
+    parser.add_argument('--tps', type=int, default=100, help="초당 시뮬레이션 틱 (0이면 최대 속도)")
+    parser.add_argument('--fps', type=int, default=60, help="초당 화면 프레임")
+    parser.add_argument('--agents', type=int, default=1, help="에이전트 수 (2 이상이면 여러 에이전트를 헤드리스로 실행)")
+    parser.add_argument('--private-maps', action='store_true', help="여러 에이전트 모드에서 탐험 지도를 따로 사용")
+    parser.add_argument('--window', type=int, default=4, help="여러 에이전트 모드에서 경로를 미리 예약하는 틱 수")
+    parser.add_argument('--path-cache', action='store_true', help="여러 에이전트 모드에서 에이전트마다 경로 캐시 사용")
+    args = parser.parse_args()
+
+    try:
+        world = maze_grid.load_grid()
+    except FileNotFoundError:
+        print("오류: 'grid.csv' 파일을 찾을 수 없습니다. 경로를 확인해주세요.")
+        sys.exit()
+    except Exception as e:
+        print(f"오류: grid.csv 파일을 읽는 중 문제가 발생했습니다: {e}")
+        sys.exit()
+
+    if args.agents > 1:
+        summary = run_agents(args.agents, shared_map = not args.private_maps, maze = world,
+                             max_ticks = args.max_ticks or 1000, vision_radius = args.vision_radius,
+                             line_of_sight = args.line_of_sight, compiled = args.compiled, window = args.window,
+                             path_cache = args.path_cache)
+        print_agents_summary(summary)
+        sys.exit()
+
+    summary = run(headless = args.headless, log_path = args.log, max_ticks = args.max_ticks, maze = world,
+                  vision_radius = args.vision_radius, line_of_sight = args.line_of_sight, compiled = args.compiled,
+                  ticks_per_second = args.tps or None, fps = args.fps)
+
+    if args.headless:
+        print_summary(summary)
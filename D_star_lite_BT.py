@@ -0,0 +1,224 @@
+import heapq
+import math
+from A_star_BT import DIRECTIONS, MOVE_COSTS, astar_cells, flatten_grid, octile_cost, record_search
+
+INF = math.inf
+
+class DStarLite:
+    # 에이전트가 들고 다니는 증분 경로 계획기 (D* Lite)
+    # 도착점에서 거꾸로 탐색한 결과(g, rhs)를 기억해두고,
+    # 지도에서 바뀐 칸 주변만 다시 계산해서 경로를 고친다.
+    # 한계: 탐색 트리의 뿌리가 도착점이라서 도착점이 바뀌면 재사용할 수 없음
+    #   탐험 목표는 목표에 닿을 때마다 바뀌므로 대부분의 계획은 새 목표의 첫 계획 (전체 A*)이고,
+    #   바뀐 칸 수에 비례하는 비용은 같은 목표로 다시 계획할 때만 해당됨
+    #   (기본 미로 한 에이전트 실행: 계획 304번 중 295번이 A*, 평균 87칸 확장 / 증분 9번, 평균 25칸 확장)
+    def __init__(self, grid):
+        self.grid = grid # 에이전트의 탐험 지도 (바뀐 칸의 값을 읽을 때 사용)
+        cells, self.rows, self.cols = flatten_grid(grid)
+
+        # 바깥에 벽 한 줄을 두른 인덱스를 사용해서 이웃 계산 때 범위 검사를 없앰
+        self.width = self.cols + 2
+        self.blocked = bytearray([1]) * ((self.rows + 2) * self.width)
+        # 벽(1)만 막힌 칸, 미탐험(3)은 A*와 똑같이 지나갈 수 있다고 가정
+        for r in range(self.rows):
+            row = cells[r * self.cols:(r + 1) * self.cols]
+            base = (r + 1) * self.width + 1
+            self.blocked[base:base + self.cols] = bytes(1 if value == 1 else 0 for value in row)
+
+        self.moves = [(move_r * self.width + move_c, movement_cost)
+                      for (move_r, move_c), movement_cost in zip(DIRECTIONS, MOVE_COSTS)]
+
+        self.goal = None
+        self.pending = [] # 아직 반영하지 않은 바뀐 칸들
+        self.expanded = 0 # 마지막 plan()에서 확장한 노드 수
+
+    def index_of(self, position):
+        return (position[0] + 1) * self.width + position[1] + 1
+
+    def index_pair(self, position):
+        # 벽을 두른 격자에서의 (row, col)
+        return (position[0] + 1, position[1] + 1)
+
+    def position_of(self, index):
+        r, c = divmod(index, self.width)
+        return (r - 1, c - 1)
+
+    def reset(self, goal):
+        # 도착점이 바뀌면 탐색 정보를 처음부터 다시 만든다
+        self.goal = goal
+        self.goal_index = self.index_of(goal)
+        self.g = {}
+        self.rhs = {self.goal_index: 0}
+        self.open_list = []    # (k1, k2, count, 셀 인덱스)
+        self.open_keys = {}    # 열린 리스트에 들어있는 셀의 현재 key
+        self.count = 0
+        self.km = 0
+        self.last_start = None
+        self.pending = []
+
+    def update_cells(self, changed_cells):
+        # update_exploration_map에서 새로 드러난 칸들을 받아서, 막힘 여부가 바뀐 칸만 기록
+        # 막힘 여부가 바뀐 칸 목록을 반환 (비어 있으면 경로 비용이 바뀌지 않음)
+        flipped = []
+        for (r, c) in changed_cells:
+            index = self.index_of((r, c))
+            value = 1 if self.grid[r][c] == 1 else 0
+            if self.blocked[index] != value:
+                self.blocked[index] = value
+                self.pending.append(index)
+                flipped.append((r, c))
+        return flipped
+
+    def calculate_key(self, index):
+        value = min(self.g.get(index, INF), self.rhs.get(index, INF))
+        r, c = divmod(index, self.width)
+        dr = abs(r - self.start_r)
+        dc = abs(c - self.start_c)
+        h = 10 * dr + 4 * dc if dr > dc else 10 * dc + 4 * dr
+        return (value + h + self.km, value)
+
+    def update_vertex(self, index):
+        g = self.g
+        if index != self.goal_index:
+            best = INF
+            if not self.blocked[index]:
+                blocked = self.blocked
+                for offset, movement_cost in self.moves:
+                    neighbor = index + offset
+                    if blocked[neighbor]:
+                        continue
+                    value = g.get(neighbor, INF) + movement_cost
+                    if value < best:
+                        best = value
+            self.rhs[index] = best
+        else:
+            best = self.rhs[index]
+
+        # 열린 리스트에서 빼고 (lazy deletion), 일관되지 않으면 다시 넣기
+        self.open_keys.pop(index, None)
+        if g.get(index, INF) != best:
+            self.push(index, self.calculate_key(index))
+
+    def update_neighbors(self, index):
+        # 막힌 이웃은 rhs가 항상 INF이므로 건너뜀
+        blocked = self.blocked
+        for offset, _ in self.moves:
+            neighbor = index + offset
+            if not blocked[neighbor]:
+                self.update_vertex(neighbor)
+
+    def push(self, index, key):
+        self.open_keys[index] = key
+        heapq.heappush(self.open_list, (key[0], key[1], self.count, index))
+        self.count += 1
+
+    def top_key(self):
+        # 오래된 항목은 버리고 가장 작은 key 반환
+        while self.open_list:
+            k1, k2, _, index = self.open_list[0]
+            if self.open_keys.get(index) == (k1, k2):
+                return (k1, k2)
+            heapq.heappop(self.open_list)
+        return (INF, INF)
+
+    def compute_shortest_path(self):
+        start_index = self.index_of(self.start)
+        g = self.g
+        rhs = self.rhs
+
+        while True:
+            top = self.top_key()
+            if top == (INF, INF):
+                break
+            if top >= self.calculate_key(start_index) and rhs.get(start_index, INF) == g.get(start_index, INF):
+                break
+
+            _, _, _, index = heapq.heappop(self.open_list)
+            del self.open_keys[index]
+            self.expanded += 1
+
+            new_key = self.calculate_key(index)
+            if top < new_key:
+                self.push(index, new_key)
+            elif g.get(index, INF) > rhs.get(index, INF):
+                g[index] = rhs[index]
+                self.update_neighbors(index)
+            else:
+                g[index] = INF
+                self.update_vertex(index)
+                self.update_neighbors(index)
+
+    def plan(self, start, goal):
+        # start에서 goal까지의 경로를 [(row, col), ...]로 반환 (없으면 None)
+        if goal != self.goal:
+            self.reset(goal)
+
+            # 새 목표의 첫 경로는 재사용할 정보가 없으므로 (이전 탐색은 이전 목표가 뿌리) 빠른 A*로 구하고,
+            # 같은 목표로 다시 계획할 때부터 D* Lite 탐색을 만들어서 증분으로 고친다
+            path = astar_cells(self.index_pair(start), self.index_pair(goal), self.blocked, self.rows + 2, self.width)
+            if path is None:
+                return None
+            return [(r - 1, c - 1) for r, c in path]
+
+        self.start = start
+        self.start_r = start[0] + 1
+        self.start_c = start[1] + 1
+        self.expanded = 0
+
+        # 에이전트가 움직인 만큼 km을 늘려서 기존 key를 그대로 쓸 수 있게 함
+        if self.last_start is not None:
+            self.km += octile_cost(self.last_start[0], self.last_start[1], start[0], start[1])
+        else:
+            self.push(self.goal_index, self.calculate_key(self.goal_index))
+        self.last_start = start
+
+        # 바뀐 칸과 그 이웃만 다시 계산
+        for index in self.pending:
+            self.update_vertex(index)
+            self.update_neighbors(index)
+        self.pending = []
+
+        self.compute_shortest_path()
+        record_search(self.expanded)
+        return self.extract_path()
+
+    def plan_around(self, start, goal, avoid):
+        # avoid 칸을 벽으로 보고 A*로 한 번 계산 (여러 에이전트: 다른 에이전트에게 오래 막힌 칸을 돌아감)
+        # D* Lite 탐색 정보는 건드리지 않음 (다음 plan()은 원래 지도로 이어서 계산)
+        index = self.index_of(avoid)
+        saved = self.blocked[index]
+        self.blocked[index] = 1
+        path = astar_cells(self.index_pair(start), self.index_pair(goal), self.blocked, self.rows + 2, self.width)
+        self.blocked[index] = saved
+        if path is None:
+            return None
+        return [(r - 1, c - 1) for r, c in path]
+
+    def extract_path(self):
+        index = self.index_of(self.start)
+        if self.g.get(index, INF) == INF:
+            return None
+
+        path = [self.start]
+        # g 값을 따라 가장 비용이 낮은 이웃으로 내려감
+        for _ in range(self.rows * self.cols):
+            if index == self.goal_index:
+                return path
+
+            best = INF
+            best_index = None
+            for offset, movement_cost in self.moves:
+                neighbor = index + offset
+                if self.blocked[neighbor]:
+                    continue
+                value = self.g.get(neighbor, INF) + movement_cost
+                if value < best:
+                    best = value
+                    best_index = neighbor
+
+            if best_index is None or best == INF:
+                return None
+            index = best_index
+            path.append(self.position_of(index))
+
+        return None
@@ -0,0 +1,387 @@
+import heapq
+import math
+from A_star_BT import DIRECTIONS, MOVE_COSTS, flatten_grid, octile_cost, record_search
+
+INF = math.inf
+
+class HPAStar:
+    # 큰 미로용 계층 경로 탐색 (HPA*)
+    # grid를 cluster_size x cluster_size 클러스터로 나누고,
+    # 클러스터 경계의 출입구(entrance)와 클러스터 안 출입구 사이 비용을 미리 계산해둔다.
+    # 질의는 추상 그래프(출입구들)에서 먼저 풀고, 실제로 쓰는 구간만 클러스터 안에서 세부 경로로 바꾼다.
+    def __init__(self, grid, cluster_size=16):
+        self.cells, self.rows, self.cols = flatten_grid(grid)
+        self.size = cluster_size
+        self.cluster_rows = (self.rows + cluster_size - 1) // cluster_size
+        self.cluster_cols = (self.cols + cluster_size - 1) // cluster_size
+
+        self.borders = {}   # 경계 key -> [(a, b, 비용), ...] (a, b는 셀 인덱스)
+        self.inter = {}     # 출입구 노드 -> {건너편 노드: 비용}
+        self.intra = {}     # 클러스터 -> {노드: {같은 클러스터의 노드: 비용}}
+        self.segments = {}  # 클러스터 -> {(노드, 노드): 세부 경로} (한 번 세부화한 구간 재사용)
+        self.adjacency = {} # 출입구 노드 -> ((이웃 노드, 비용), ...) (intra와 inter를 합친 것, 질의 때 만듦)
+        self.expanded = 0   # 마지막 질의에서 확장한 추상 노드 수
+
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                for key in self.border_keys(cr, cc, own=True):
+                    self.build_border(key)
+
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                self.build_intra((cr, cc))
+
+    # --- 클러스터와 경계 ---
+
+    def cluster_of(self, index):
+        r, c = divmod(index, self.cols)
+        return (r // self.size, c // self.size)
+
+    def bounds(self, cluster):
+        cr, cc = cluster
+        r0 = cr * self.size
+        c0 = cc * self.size
+        return r0, min(r0 + self.size, self.rows), c0, min(c0 + self.size, self.cols)
+
+    def free(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols and self.cells[r * self.cols + c] != 1
+
+    def border_keys(self, cr, cc, own=False):
+        # 클러스터 (cr, cc)에 닿는 경계들
+        # 'h': 오른쪽, 'v': 아래쪽, 'd': 오른쪽 아래 모서리, 'a': 왼쪽 아래 모서리 (왼쪽 위 클러스터 기준)
+        keys = [('h', cr, cc), ('v', cr, cc), ('d', cr, cc), ('a', cr, cc - 1)]
+        if not own:
+            keys += [('h', cr, cc - 1), ('v', cr - 1, cc), ('d', cr - 1, cc - 1), ('a', cr - 1, cc)]
+        return [key for key in keys if self.valid_border(key)]
+
+    def valid_border(self, key):
+        kind, cr, cc = key
+        if cr < 0 or cc < 0:
+            return False
+        if kind == 'h':
+            return cr < self.cluster_rows and cc + 1 < self.cluster_cols
+        if kind == 'v':
+            return cr + 1 < self.cluster_rows and cc < self.cluster_cols
+        return cr + 1 < self.cluster_rows and cc + 1 < self.cluster_cols
+
+    def crossing_edges(self, key):
+        # 경계를 건너는 모든 (경계 위치 i, j, a, b, 비용) 목록
+        kind, cr, cc = key
+        edges = []
+        cols = self.cols
+
+        if kind in ('h', 'v'):
+            if kind == 'h':
+                r0, r1, _, _ = self.bounds((cr, cc))
+                ca = (cc + 1) * self.size - 1
+                side_a = [(i, ca) for i in range(r0, r1)]
+                side_b = [(i, ca + 1) for i in range(r0, r1)]
+            else:
+                _, _, c0, c1 = self.bounds((cr, cc))
+                ra = (cr + 1) * self.size - 1
+                side_a = [(ra, i) for i in range(c0, c1)]
+                side_b = [(ra + 1, i) for i in range(c0, c1)]
+
+            for i, (ar, ac) in enumerate(side_a):
+                if not self.free(ar, ac):
+                    continue
+                for j in (i - 1, i, i + 1):
+                    if 0 <= j < len(side_b) and self.free(*side_b[j]):
+                        br, bc = side_b[j]
+                        edges.append((i, j, ar * cols + ac, br * cols + bc, 10 if i == j else 14))
+
+        elif kind == 'd':
+            ar = (cr + 1) * self.size - 1
+            ac = (cc + 1) * self.size - 1
+            if self.free(ar, ac) and self.free(ar + 1, ac + 1):
+                edges.append((0, 0, ar * cols + ac, (ar + 1) * cols + ac + 1, 14))
+        else:
+            ar = (cr + 1) * self.size - 1
+            ac = (cc + 1) * self.size
+            if self.free(ar, ac) and self.free(ar + 1, ac - 1):
+                edges.append((0, 0, ar * cols + ac, (ar + 1) * cols + ac - 1, 14))
+
+        return edges
+
+    def build_border(self, key):
+        # 서로 이어진 경계 통로마다 출입구 한 쌍만 남김
+        # (양쪽 끝 칸들이 각각 경계를 따라 붙어 있으므로 클러스터 안에서 서로 연결됨)
+        edges = self.crossing_edges(key)
+
+        groups = []
+        for edge in edges:
+            i, j = edge[0], edge[1]
+            joined = [g for g in groups if any(abs(i - e[0]) <= 1 and abs(j - e[1]) <= 1 for e in g)]
+            if joined:
+                merged = joined[0]
+                for other in joined[1:]:
+                    merged.extend(other)
+                    groups.remove(other)
+                merged.append(edge)
+            else:
+                groups.append([edge])
+
+        entrances = []
+        for group in groups:
+            straight = [e for e in group if e[4] == 10]
+            candidates = straight if straight else group
+            _, _, a, b, cost = candidates[len(candidates) // 2]
+            entrances.append((a, b, cost))
+
+        # 이전 출입구 간선을 지우고 새로 연결
+        for a, b, _ in self.borders.get(key, []):
+            self.inter[a].pop(b, None)
+            self.inter[b].pop(a, None)
+            if not self.inter[a]:
+                del self.inter[a]
+            if not self.inter[b]:
+                del self.inter[b]
+
+        self.borders[key] = entrances
+        for a, b, cost in entrances:
+            self.inter.setdefault(a, {})[b] = cost
+            self.inter.setdefault(b, {})[a] = cost
+
+    def cluster_nodes(self, cluster):
+        nodes = set()
+        for key in self.border_keys(cluster[0], cluster[1]):
+            for a, b, _ in self.borders[key]:
+                if self.cluster_of(a) == cluster:
+                    nodes.add(a)
+                if self.cluster_of(b) == cluster:
+                    nodes.add(b)
+        return nodes
+
+    def build_intra(self, cluster):
+        # 클러스터 안 출입구들 사이의 최단 비용 (클러스터 밖으로 나가지 않음)
+        nodes = self.cluster_nodes(cluster)
+        edges = {}
+        for node in nodes:
+            dist = self.cluster_dijkstra(node, cluster, nodes)
+            edges[node] = {other: cost for other, cost in dist.items() if other != node}
+        self.intra[cluster] = edges
+        self.segments[cluster] = {}
+        self.adjacency.clear()
+
+    # --- 클러스터 안 탐색 ---
+
+    def cluster_dijkstra(self, source, cluster, targets):
+        # source에서 클러스터 안의 targets까지 비용 (도달 못하면 빠짐)
+        r0, r1, c0, c1 = self.bounds(cluster)
+        cols = self.cols
+        cells = self.cells
+        remaining = set(targets)
+        found = {}
+
+        dist = {source: 0}
+        open_list = [(0, source)]
+        while open_list and remaining:
+            d, index = heapq.heappop(open_list)
+            if d > dist[index]:
+                continue
+            if index in remaining:
+                remaining.discard(index)
+                found[index] = d
+
+            r, c = divmod(index, cols)
+            for (move_r, move_c), movement_cost in zip(DIRECTIONS, MOVE_COSTS):
+                nr = r + move_r
+                nc = c + move_c
+                if not (r0 <= nr < r1 and c0 <= nc < c1):
+                    continue
+                neighbor = nr * cols + nc
+                if cells[neighbor] == 1:
+                    continue
+                nd = d + movement_cost
+                if nd < dist.get(neighbor, INF):
+                    dist[neighbor] = nd
+                    heapq.heappush(open_list, (nd, neighbor))
+
+        return found
+
+    def cluster_path(self, source, target, cluster):
+        # 클러스터 안에서만 움직이는 A* 세부 경로 (셀 인덱스 리스트)
+        r0, r1, c0, c1 = self.bounds(cluster)
+        cols = self.cols
+        cells = self.cells
+        tr, tc = divmod(target, cols)
+
+        g = {source: 0}
+        parent = {source: None}
+        open_list = [(0, 0, source)]
+        while open_list:
+            _, d, index = heapq.heappop(open_list)
+            if d > g[index]:
+                continue
+            if index == target:
+                path = []
+                while index is not None:
+                    path.append(index)
+                    index = parent[index]
+                return path[::-1]
+
+            r, c = divmod(index, cols)
+            for (move_r, move_c), movement_cost in zip(DIRECTIONS, MOVE_COSTS):
+                nr = r + move_r
+                nc = c + move_c
+                if not (r0 <= nr < r1 and c0 <= nc < c1):
+                    continue
+                neighbor = nr * cols + nc
+                if cells[neighbor] == 1:
+                    continue
+                nd = d + movement_cost
+                if nd < g.get(neighbor, INF):
+                    g[neighbor] = nd
+                    parent[neighbor] = index
+                    heapq.heappush(open_list, (nd + octile_cost(nr, nc, tr, tc), nd, neighbor))
+
+        return None
+
+    # --- 질의 ---
+
+    def abstract_path(self, start, end):
+        # 추상 그래프 위의 경로 (시작점, 출입구들..., 도착점)를 셀 인덱스로 반환
+        start_index = start[0] * self.cols + start[1]
+        end_index = end[0] * self.cols + end[1]
+        if self.cells[start_index] == 1 or self.cells[end_index] == 1:
+            return None
+
+        start_cluster = self.cluster_of(start_index)
+        end_cluster = self.cluster_of(end_index)
+
+        # 시작점/도착점을 자기 클러스터의 출입구에 임시로 연결
+        start_edges = self.cluster_dijkstra(start_index, start_cluster, self.cluster_nodes(start_cluster) | {end_index})
+        end_edges = self.cluster_dijkstra(end_index, end_cluster, self.cluster_nodes(end_cluster))
+
+        start_items = dict(start_edges)
+        start_items.update(self.inter.get(start_index, {}))
+        start_items = tuple(start_items.items())
+
+        end_r, end_c = end
+        cols = self.cols
+        adjacency = self.adjacency
+        g = {start_index: 0}
+        parent = {start_index: None}
+        open_list = [(0, 0, start_index)]
+        expanded = 0
+        while open_list:
+            _, d, node = heapq.heappop(open_list)
+            if d > g[node]:
+                continue
+            expanded += 1
+            if node == end_index:
+                self.expanded = expanded
+                record_search(expanded)
+                nodes = []
+                while node is not None:
+                    nodes.append(node)
+                    node = parent[node]
+                return nodes[::-1]
+
+            if node == start_index:
+                edges = start_items
+            else:
+                edges = adjacency.get(node)
+                if edges is None:
+                    edges = self.node_edges(node)
+                if node in end_edges:
+                    edges = edges + ((end_index, end_edges[node]),)
+
+            for neighbor, cost in edges:
+                nd = d + cost
+                if nd < g.get(neighbor, INF):
+                    g[neighbor] = nd
+                    parent[neighbor] = node
+                    r, c = divmod(neighbor, cols)
+                    dr = r - end_r if r > end_r else end_r - r
+                    dc = c - end_c if c > end_c else end_c - c
+                    h = 10 * dr + 4 * dc if dr > dc else 10 * dc + 4 * dr
+                    heapq.heappush(open_list, (nd + h, nd, neighbor))
+
+        self.expanded = expanded
+        record_search(expanded)
+        return None
+
+    def node_edges(self, node):
+        # 출입구 노드의 클러스터 안 간선과 경계 간선을 합쳐서 기억 (클러스터를 다시 만들면 지워짐)
+        edges = dict(self.intra[self.cluster_of(node)].get(node, {}))
+        edges.update(self.inter.get(node, {}))
+        edges = self.adjacency[node] = tuple(edges.items())
+        return edges
+
+    def refine(self, nodes):
+        # 추상 경로의 각 구간을 세부 경로로 바꾸면서 하나씩 내보냄 (필요한 구간만 계산)
+        for a, b in zip(nodes, nodes[1:]):
+            cluster = self.cluster_of(a)
+            if self.inter.get(a, {}).get(b) is not None and cluster != self.cluster_of(b):
+                yield [divmod(b, self.cols)]
+            else:
+                # 출입구 사이 구간은 클러스터가 다시 만들어지기 전까지 재사용
+                cached = self.segments[cluster]
+                segment = cached.get((a, b))
+                if segment is None:
+                    segment = [divmod(index, self.cols) for index in self.cluster_path(a, b, cluster)[1:]]
+                    if a in self.intra[cluster] and b in self.intra[cluster]:
+                        cached[(a, b)] = segment
+                yield segment
+
+    def find_path_lazy(self, start, end):
+        # 추상 경로만 풀고, 세부 경로는 따라가는 만큼만 계산하는 형태 (없으면 None)
+        # 반환: (추상 경로의 칸 [(row, col), ...], start 다음 칸부터 한 칸씩 내보내는 반복자)
+        nodes = self.abstract_path(start, end)
+        if nodes is None:
+            return None
+        return [divmod(node, self.cols) for node in nodes], self.iter_cells(nodes)
+
+    def iter_cells(self, nodes):
+        # refine()의 구간들을 이어서 칸 단위로 내보냄 (다음 구간은 앞 구간을 다 쓴 뒤에 세부화)
+        for segment in self.refine(nodes):
+            yield from segment
+
+    def find_path(self, start, end):
+        # A_star_BT.astar와 같은 형식의 경로 [(row, col), ...] (없으면 None)
+        # 모든 구간을 세부화하므로, 경로 앞부분만 필요하면 find_path_lazy()를 사용
+        lazy = self.find_path_lazy(start, end)
+        if lazy is None:
+            return None
+
+        path = [start]
+        path.extend(lazy[1])
+        return path
+
+    def update_cell(self, r, c, value):
+        # 칸 하나가 바뀌면 그 칸이 속한 클러스터만 다시 계산
+        # (클러스터 가장자리 칸이면 경계 출입구가 바뀐 이웃 클러스터도 함께 갱신)
+        index = r * self.cols + c
+        if self.cells[index] == value:
+            return
+        self.cells[index] = value
+
+        cluster = self.cluster_of(index)
+        r0, r1, c0, c1 = self.bounds(cluster)
+        affected = [cluster]
+
+        if r in (r0, r1 - 1) or c in (c0, c1 - 1):
+            keys = self.border_keys(*cluster)
+            neighbors = set()
+            for key in keys:
+                neighbors.update(self.border_clusters(key))
+            neighbors.discard(cluster)
+
+            old_nodes = {other: self.cluster_nodes(other) for other in neighbors}
+            for key in keys:
+                self.build_border(key)
+            affected += [other for other in neighbors if self.cluster_nodes(other) != old_nodes[other]]
+
+        for other in affected:
+            self.build_intra(other)
+
+    def border_clusters(self, key):
+        kind, cr, cc = key
+        if kind == 'h':
+            return [(cr, cc), (cr, cc + 1)]
+        if kind == 'v':
+            return [(cr, cc), (cr + 1, cc)]
+        if kind == 'd':
+            return [(cr, cc), (cr + 1, cc + 1)]
+        return [(cr, cc + 1), (cr + 1, cc)]
@@ -0,0 +1,187 @@
+import argparse
+import csv
+import json
+import os
+import queue
+import struct
+import threading
+import numpy as np
+
+CSV_HEADERS = ['Tick', 'Position_Row', 'Position_Col', 'Current_Action', 'Target', 'Node_Status', 'Items_Collected', 'Exploration_Percent']
+
+# 바이너리 로그 파일: 헤더 (매직, 전체 칸 수) + 청크들
+# 청크 = 청크 헤더 (매직, 행 수, 새 사전 항목 JSON 길이) + 새 사전 항목 JSON + 열마다 원시 배열
+LOG_MAGIC = b'ALG1'
+LOG_HEADER = struct.Struct('<4sQ')
+CHUNK_MAGIC = b'CHNK'
+CHUNK_HEADER = struct.Struct('<4sII')
+
+# 열 이름과 타입 (행동, 노드 상태는 사전 번호로 저장, 목표가 없으면 -1)
+COLUMNS = [
+    ('tick', np.int64),
+    ('row', np.int32),
+    ('col', np.int32),
+    ('action', np.uint8),
+    ('target_row', np.int32),
+    ('target_col', np.int32),
+    ('status', np.uint8),
+    ('items', np.int32),
+    ('explored', np.int32), # 탐험한 칸 수 (퍼센트는 전체 칸 수로 계산)
+]
+
+def format_percent(explored, total_cells):
+    return f"{explored / total_cells * 100:.2f}%"
+
+class CsvLog:
+    # 예전과 같은 CSV 로그 (한 틱에 한 줄)
+    def __init__(self, path, total_cells):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(CSV_HEADERS)
+        self.total_cells = total_cells
+
+    def append(self, tick, row, col, action, target, status, items, explored):
+        self.writer.writerow([tick, row, col, action, str(target), status, items, format_percent(explored, self.total_cells)])
+
+    def close(self):
+        self.file.close()
+
+class BinaryLog:
+    # 열마다 미리 할당한 배열에 모았다가, 청크가 차면 백그라운드 스레드가 파일에 씀
+    # 틱마다 문자열을 만들거나 파일에 쓰지 않음
+    def __init__(self, path, total_cells, chunk_size=4096):
+        self.file = open(path, 'wb')
+        self.file.write(LOG_HEADER.pack(LOG_MAGIC, total_cells))
+        self.chunk_size = chunk_size
+
+        # 사전 인코딩: 이름 -> 번호, 아직 파일에 쓰지 않은 새 이름들
+        self.codes = {'action': {}, 'status': {}}
+        self.new_names = {'action': [], 'status': []}
+
+        self.columns = self.allocate()
+        self.count = 0
+
+        self.chunks = queue.Queue(maxsize=4) # 쓰기가 밀리면 메인 루프가 잠깐 기다림
+        self.error = None
+        self.thread = threading.Thread(target=self.write_chunks, daemon=True)
+        self.thread.start()
+
+    def allocate(self):
+        return [np.empty(self.chunk_size, dtype=dtype) for _, dtype in COLUMNS]
+
+    def encode(self, kind, name):
+        codes = self.codes[kind]
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(codes)
+            self.new_names[kind].append(name)
+        return code
+
+    def append(self, tick, row, col, action, target, status, items, explored):
+        i = self.count
+        tick_column, row_column, col_column, action_column, target_row_column, target_col_column, \
+            status_column, items_column, explored_column = self.columns
+        tick_column[i] = tick
+        row_column[i] = row
+        col_column[i] = col
+        action_column[i] = self.encode('action', action)
+        if target is None:
+            target_row_column[i] = target_col_column[i] = -1
+        else:
+            target_row_column[i], target_col_column[i] = target
+        status_column[i] = self.encode('status', status)
+        items_column[i] = items
+        explored_column[i] = explored
+
+        self.count += 1
+        if self.count == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        # 모은 행을 청크로 넘기고 새 버퍼를 준비
+        if self.count == 0:
+            return
+        if self.error:
+            raise self.error
+        names = json.dumps(self.new_names).encode('utf-8')
+        self.chunks.put((self.count, names, self.columns))
+        self.new_names = {'action': [], 'status': []}
+        self.columns = self.allocate()
+        self.count = 0
+
+    def write_chunks(self):
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                return
+            count, names, columns = chunk
+            try:
+                self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, count, len(names)))
+                self.file.write(names)
+                for column in columns:
+                    self.file.write(column[:count].tobytes())
+            except Exception as e:
+                self.error = e
+
+    def close(self):
+        self.flush()
+        self.chunks.put(None)
+        self.thread.join()
+        self.file.close()
+        if self.error:
+            raise self.error
+
+def open_log(path, total_cells):
+    # 확장자가 .bin이면 바이너리 로그, 아니면 CSV 로그
+    if path.endswith('.bin'):
+        return BinaryLog(path, total_cells)
+    return CsvLog(path, total_cells)
+
+def read_log(path):
+    # 바이너리 로그를 읽어서 {열 이름: 배열}, 사전, 전체 칸 수를 반환
+    with open(path, 'rb') as f:
+        magic, total_cells = LOG_HEADER.unpack(f.read(LOG_HEADER.size))
+        if magic != LOG_MAGIC:
+            raise ValueError(f"'{path}'는 에이전트 바이너리 로그 파일이 아닙니다.")
+
+        names = {'action': [], 'status': []}
+        parts = {name: [] for name, _ in COLUMNS}
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if not header:
+                break
+            magic, count, names_size = CHUNK_HEADER.unpack(header)
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"'{path}'의 청크가 손상되었습니다.")
+            for kind, new_names in json.loads(f.read(names_size)).items():
+                names[kind].extend(new_names)
+            for name, dtype in COLUMNS:
+                parts[name].append(np.frombuffer(f.read(count * np.dtype(dtype).itemsize), dtype=dtype))
+
+    columns = {name: np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+               for (name, dtype), chunks in zip(COLUMNS, parts.values())}
+    return columns, names, total_cells
+
+def export_csv(path, csv_path):
+    # 바이너리 로그를 예전 agent_log.csv와 같은 형식으로 내보냄
+    columns, names, total_cells = read_log(path)
+    actions = names['action']
+    statuses = names['status']
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        rows = zip(*(columns[name].tolist() for name, _ in COLUMNS))
+        for tick, row, col, action, target_row, target_col, status, items, explored in rows:
+            target = None if target_row < 0 else (target_row, target_col)
+            writer.writerow([tick, row, col, actions[action], str(target), statuses[status], items,
+                             format_percent(explored, total_cells)])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="에이전트 바이너리 로그를 CSV로 내보내기")
+    parser.add_argument('log', help="바이너리 로그 파일 (.bin)")
+    parser.add_argument('--csv', default=None, help="내보낼 CSV 경로 (기본: 로그 이름.csv)")
+    args = parser.parse_args()
+
+    csv_path = args.csv or os.path.splitext(args.log)[0] + '.csv'
+    export_csv(args.log, csv_path)
+    print(f"'{csv_path}' 파일로 내보냈습니다.")
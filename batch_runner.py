@@ -0,0 +1,102 @@
+import argparse
+import csv
+import importlib.util
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import maze_grid
+
+# 'Behavior Tree.py'는 파일 이름에 공백이 있어서 import 문으로 불러올 수 없으므로 경로로 불러옴
+BEHAVIOR_TREE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Behavior Tree.py')
+
+RESULT_HEADERS = ['Job', 'Maze', 'Seed', 'Escaped', 'Ticks', 'Items_Collected', 'Exploration_Percent',
+                  'Search_Calls', 'Nodes_Expanded', 'Wall_Time', 'Ticks_Per_Sec']
+
+# 워커 프로세스마다 한 번만 불러오는 행동 트리 모듈
+_behavior_tree = None
+
+def load_behavior_tree():
+    spec = importlib.util.spec_from_file_location('behavior_tree', BEHAVIOR_TREE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _init_worker():
+    global _behavior_tree
+    _behavior_tree = load_behavior_tree()
+
+def make_jobs(mazes, seeds, width, height):
+    # (작업 이름, 미로 파일 경로 또는 None, 시드 또는 None) 목록
+    jobs = [(f"maze:{path}", path, None) for path in mazes]
+    jobs += [(f"seed:{seed}:{width}x{height}", None, seed) for seed in seeds]
+    return jobs
+
+def run_job(job, width, height, max_ticks):
+    # 작업 하나를 헤드리스로 실행하고 결과 한 줄을 반환
+    name, path, seed = job
+    if path is not None:
+        world = maze_grid.load_grid(path)
+    else:
+        # 시드로 만든 미로 (출구가 (height-1, width-1)에 있으려면 너비/높이가 홀수여야 함)
+        world = maze_grid.generate_dfs(width, height, seed)
+
+    summary = _behavior_tree.run(headless = True, log_path = None, max_ticks = max_ticks, maze = world)
+    return [name, path or '', '' if seed is None else seed, summary['escaped'], summary['ticks'],
+            summary['items_collected'], f"{summary['exploration_percent']:.2f}", summary['search_calls'],
+            summary['nodes_expanded'], f"{summary['wall_time']:.4f}", f"{summary['ticks_per_sec']:.1f}"]
+
+def completed_jobs(output):
+    # 체크포인트: 결과 파일에 이미 기록된 작업 이름들
+    if not os.path.exists(output):
+        return set()
+    with open(output, newline='', encoding='utf-8') as f:
+        return {row['Job'] for row in csv.DictReader(f)}
+
+def run_batch(jobs, output='batch_results.csv', workers=None, width=51, height=51, max_ticks=100000):
+    # 작업들을 프로세스 풀에서 실행하고, 끝나는 대로 결과 파일에 한 줄씩 추가 (중단 후 다시 실행하면 이어서 진행)
+    done = completed_jobs(output)
+    pending = [job for job in jobs if job[0] not in done]
+    print(f"전체 {len(jobs)}개 작업 중 {len(done & {job[0] for job in jobs})}개 완료됨, {len(pending)}개 실행")
+
+    new_file = not os.path.exists(output)
+    with open(output, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(RESULT_HEADERS)
+            f.flush()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(run_job, job, width, height, max_ticks): job for job in pending}
+            for count, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    print(f"작업 실패: {job[0]} ({e})")
+                    continue
+                writer.writerow(row)
+                f.flush() # 작업마다 바로 기록해서 중단돼도 결과가 남도록 함
+                print(f"[{count}/{len(pending)}] {row[0]}: 탈출 {row[3]}, {row[4]}틱")
+
+    return output
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="여러 미로/시드에 대해 에이전트 시뮬레이션을 병렬로 실행")
+    parser.add_argument('--mazes', nargs='*', default=[], help="미로 파일 경로 (.csv 또는 .bin이 있는 .csv)")
+    parser.add_argument('--seeds', nargs='*', type=int, default=[], help="미로 생성 시드")
+    parser.add_argument('--seed-count', type=int, default=0, help="시드 0..N-1 추가")
+    parser.add_argument('--width', type=int, default=51)
+    parser.add_argument('--height', type=int, default=51)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-ticks', type=int, default=100000)
+    parser.add_argument('--output', default='batch_results.csv')
+    args = parser.parse_args()
+
+    seeds = list(args.seeds) + list(range(args.seed_count))
+    jobs = make_jobs(args.mazes, seeds, args.width, args.height)
+    if not jobs:
+        print("실행할 작업이 없습니다. --mazes 또는 --seeds/--seed-count를 지정하세요.")
+        sys.exit()
+
+    run_batch(jobs, args.output, args.workers, args.width, args.height, args.max_ticks)
+    print(f"결과를 '{args.output}'에 저장했습니다.")
@@ -0,0 +1,129 @@
+import argparse
+import sys
+import time
+from batch_runner import load_behavior_tree
+import maze_grid
+
+def mirror(bt, node, pattern):
+    # 같은 모양의 트리를 만들되, 잎은 정해진 결과를 차례로 반환하는 노드로 바꿈 (트리 실행 비용만 측정)
+    if not node.children:
+        return ScriptedLeaf(bt, node.name, pattern)
+    copy = type(node)(node.name, memory = node.memory)
+    for child in node.children:
+        copy.add_child(mirror(bt, child, pattern))
+    return copy
+
+class ScriptedLeaf:
+    def __init__(self, bt, name, pattern):
+        self.name = name
+        self.children = []
+        self.results = [getattr(bt.Status, value) for value in pattern]
+        self.count = 0
+
+    def state(self, agent):
+        self.count += 1
+        return self.results[self.count % len(self.results)]
+
+    def halt(self, blackboard):
+        pass
+
+class BenchAgent:
+    def __init__(self, bt):
+        self.blackboard = bt.Blackboard()
+
+def bench_tree(bt, runtime, ticks, pattern):
+    tree = runtime(mirror(bt, bt.root, pattern))
+    agent = BenchAgent(bt)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tree.tick(agent)
+    return ticks / (time.perf_counter() - start)
+
+def bench_simulation(bt, compiled, repeat, maze):
+    # 전체 시뮬레이션 (경로 탐색 포함) 초당 틱, 여러 번 중 가장 빠른 값
+    best = None
+    for _ in range(repeat):
+        summary = bt.run(headless = True, log_path = None, maze = maze, compiled = compiled)
+        if best is None or summary['ticks_per_sec'] > best['ticks_per_sec']:
+            best = summary
+    return best
+
+# --check 때 시드 목록과 별도로 항상 돌리는 교착 회귀 사례
+# (에이전트 수, 미로 크기, 시드, 아이템 확률, 지도 공유, 최대 틱)
+CHECK_CASES = [
+    (40, 31, 5, 0.05, True, 8000), # 지도를 다 본 뒤 아이템으로 가다 막혔던 칸 기억 때문에 탈출하지 않던 에이전트
+]
+
+def bench_agents(bt, counts, ticks, size, shared_map, seed = 0, item_probability = None):
+    # 에이전트 수를 늘려가며 같은 미로에서 최대 ticks틱을 실행 (여러 에이전트 모드, 묶음 실행 트리)
+    # item_probability: 미로의 아이템 확률 (None이면 maze_grid 기본값)
+    results = []
+    default_probability = maze_grid.ITEM_PROBABILITY
+    for count in counts:
+        # 아이템을 주우면 grid가 바뀌므로 실행마다 같은 시드로 새로 만듦
+        if item_probability is not None:
+            maze_grid.ITEM_PROBABILITY = item_probability
+        world = maze_grid.generate_dfs(size, size, seed)
+        maze_grid.ITEM_PROBABILITY = default_probability
+        results.append(bt.run_agents(count, shared_map = shared_map, maze = world, max_ticks = ticks,
+                                     compiled = True, seed = seed))
+    return results
+
+def print_agents_table(results):
+    print(f"{'에이전트':>8} {'틱':>6} {'ticks/sec':>10} {'agent-ticks/sec':>16} {'탈출':>6} {'대기':>8} {'밀려남':>7} {'충돌':>4}")
+    for summary in results:
+        print(f"{summary['agents']:>8} {summary['ticks']:>6} {summary['ticks_per_sec']:>10.1f} "
+              f"{summary['agent_ticks_per_sec']:>16.0f} {summary['escaped']:>6} {summary['waits']:>8} "
+              f"{summary['pushes']:>7} {summary['collisions']:>4}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="행동 트리 인터프리터와 컴파일된 트리의 초당 틱 비교")
+    parser.add_argument('--ticks', type=int, default=200000, help="트리만 실행하는 벤치마크의 틱 수")
+    parser.add_argument('--repeat', type=int, default=3, help="전체 시뮬레이션 반복 횟수")
+    parser.add_argument('--maze', default='maze_grid.csv')
+    parser.add_argument('--pattern', default='FAILED,SUCCESS,RUNNING', help="가짜 잎 노드가 차례로 반환할 결과")
+    parser.add_argument('--agents', default='', help="에이전트 수 목록 (예: 1,10,100,1000). 주면 여러 에이전트 확장성만 측정")
+    parser.add_argument('--agents-size', type=int, default=101, help="여러 에이전트 측정에 쓸 DFS 미로 크기 (홀수)")
+    parser.add_argument('--agents-ticks', type=int, default=300, help="여러 에이전트 측정의 최대 틱 수")
+    parser.add_argument('--private-maps', action='store_true', help="에이전트마다 탐험 지도를 따로 사용")
+    parser.add_argument('--seeds', default='0', help="여러 에이전트 측정에 쓸 미로와 시작 위치의 시드 목록 (예: 0,1,2)")
+    parser.add_argument('--check', action='store_true',
+                        help="CHECK_CASES도 함께 실행하고, 탈출하지 못한 에이전트나 충돌이 하나라도 있으면 종료 코드 1 (교착 회귀 검사용)")
+    args = parser.parse_args()
+
+    bt = load_behavior_tree()
+
+    if args.agents or args.check:
+        counts = [int(count) for count in args.agents.split(',')] if args.agents else []
+        runs = [(counts, args.agents_size, int(seed), None, not args.private_maps, args.agents_ticks)
+                for seed in args.seeds.split(',') if counts]
+        if args.check:
+            runs += [([count], size, seed, probability, shared_map, ticks)
+                     for count, size, seed, probability, shared_map, ticks in CHECK_CASES]
+        failed = []
+        for run_counts, size, seed, probability, shared_map, ticks in runs:
+            results = bench_agents(bt, run_counts, ticks, size, shared_map, seed, probability)
+            print(f"{size}x{size} 미로 (시드 {seed}{'' if probability is None else f', 아이템 확률 {probability}'}), "
+                  f"{'공유 지도' if shared_map else '각자 지도'}, 최대 {ticks}틱")
+            print_agents_table(results)
+            failed += [(seed, summary) for summary in results
+                       if summary['escaped'] < summary['agents'] or summary['collisions']]
+        if args.check and failed:
+            for seed, summary in failed:
+                print(f"실패: 시드 {seed}, 에이전트 {summary['agents']}명 중 {summary['escaped']}명 탈출, "
+                      f"충돌 {summary['collisions']}번")
+            sys.exit(1)
+        sys.exit()
+    pattern = args.pattern.split(',')
+
+    interpreted = bench_tree(bt, bt.BehaviorTree, args.ticks, pattern)
+    compiled = bench_tree(bt, bt.CompiledTree, args.ticks, pattern)
+    print(f"트리만 실행: 인터프리터 {interpreted:.0f} ticks/sec, 컴파일 {compiled:.0f} ticks/sec ({compiled / interpreted:.2f}배)")
+
+    # 아이템을 주우면 grid가 바뀌므로 실행마다 파일에서 새로 불러옴
+    interpreted = bench_simulation(bt, False, args.repeat, args.maze)
+    compiled = bench_simulation(bt, True, args.repeat, args.maze)
+    if (interpreted['ticks'], interpreted['items_collected']) != (compiled['ticks'], compiled['items_collected']):
+        print("경고: 두 실행 결과가 다릅니다.")
+    print(f"전체 시뮬레이션 ({interpreted['ticks']}틱): 인터프리터 {interpreted['ticks_per_sec']:.0f} ticks/sec, "
+          f"컴파일 {compiled['ticks_per_sec']:.0f} ticks/sec ({compiled['ticks_per_sec'] / interpreted['ticks_per_sec']:.2f}배)")
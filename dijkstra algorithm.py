@@ -1,11 +1,16 @@
+import sys
+import itertools
+import numpy as np
 import pygame
+import grid_renderer_BT
+import scheduler_BT
+import search_steps_BT
 
 pygame.init
 
 SCREEN_WIDTH = 600
 SCREEN_HEIGHT = 800
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT)) #화면 크기 설정
-clock = pygame.time.Clock()
 
 BLACK = (0, 0, 0)
 GRAY = (128, 128, 128)
@@ -13,6 +18,10 @@ WHITE = (255, 255, 255)
 
 CELL_SIZE = 40
 
+STEPS_PER_SECOND = 3 # 초당 탐색 단계 수 (None이면 최대 속도)
+FPS = 30 # 초당 화면 프레임
+EXPANSIONS_PER_STEP = 1 # 한 단계에 확장할 노드 수
+
 # 0: 길, 1: 벽
 grid = [
     [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
@@ -33,116 +42,72 @@ start = (0, 0)
 # 도착점 (row, col)
 end = (9, 14)
 
-class Node:
-    def __init__(self, parent=None, position=None):
-        self.parent = parent      # 이 노드를 발견한 부모 노드
-        self.position = position  # 현재 노드의 위치 (row, col)
+# --bidirectional: 출발점과 도착점에서 동시에 탐색하는 양방향 Dijkstra
+BIDIRECTIONAL = '--bidirectional' in sys.argv
+args = [arg for arg in sys.argv[1:] if arg != '--bidirectional']
 
-        self.g = 0  # 시작점부터 현재 노드까지의 비용
+# 미로 CSV를 주면 그 미로의 왼쪽 위에서 오른쪽 아래까지 최대 속도로 탐색 (예: maze_grid.csv, 500x500 미로)
+if args:
+    grid = np.loadtxt(args[0], delimiter = ',', dtype = int)
+    start = (0, 0)
+    end = (len(grid) - 1, len(grid[0]) - 1)
+    CELL_SIZE = max(1, min(SCREEN_WIDTH // len(grid[0]), (SCREEN_HEIGHT - 100) // len(grid)))
+    STEPS_PER_SECOND = None
 
-    # 두 노드가 같은지 비교하기 위한 함수
-    def __eq__(self, other):
-        return self.position == other.position
-    
-unvisited_list = []  # 방문 후보 리스트
-visited_list = [] # 방문 완료 리스트
 path = None
 path_found = False # 경로를 찾았는지 알려주는 플래그
-    
-# 시작 노드와 도착 노드를 생성
-start_node = Node(None, start)
-end_node = Node(None, end)
-
-# unvisited_list에 시작 노드를 추가
-unvisited_list.append(start_node)
+search_done = False # 탐색이 끝났는지 (경로를 찾았거나, 갈 수 있는 칸을 모두 확인함)
+expanded = 0 # 확장한 노드 수 (양방향이면 두 방향의 합)
+
+# 화면에 그릴 내용을 칸마다 팔레트 번호로 기억 (바뀐 칸만 다시 그림)
+# 0: 길 (테두리만), 1: 벽, 2: unvisited_list (파랑), 3: visited_list (빨강), 4: 최종 경로 (초록)
+ROAD, WALL, OPEN, CLOSED, FINAL = range(5)
+renderer = grid_renderer_BT.GridRenderer(len(grid), len(grid[0]), CELL_SIZE,
+                                         [WHITE, GRAY, (0, 0, 255), (255, 0, 0), (0, 255, 0)], outlined = {ROAD})
+renderer.cells[:] = np.asarray(grid) == 1 # 아이템 등 벽이 아닌 칸은 모두 길로 그림
+renderer.cells[start] = OPEN
+
+# 확장할 때마다 이벤트를 내보내는 Dijkstra (휴리스틱 없음) 탐색 (힙 + 닫힌 리스트 집합, 두 시각화가 같이 사용)
+if BIDIRECTIONAL:
+    search = search_steps_BT.bidirectional_steps(grid, start, end)
+    renderer.cells[end] = OPEN
+else:
+    search = search_steps_BT.search_steps(grid, start, end)
 
 def dijkstra_step():
-    global path, path_found # 전역 변수 선언
-
-    if not unvisited_list or path_found:
-        return
-    
-    # 1. 가장 좋은 노드 선택하기
-    # unvisited_list에 있는 노드 중 g 비용이 가장 낮은 노드를 찾는다.
-    current_node = unvisited_list[0]
-    current_index = 0
-    for index, item in enumerate(unvisited_list):
-        if item.g < current_node.g:
-            current_node = item
-            current_index = index
-
-    # 2. 선택된 노드를 unvisited_list에서 빼고, visited_list에 추가
-    unvisited_list.pop(current_index)
-    visited_list.append(current_node)
-
-    # 3. 목표에 도달했는지 확인
-    # 현재 노드가 도착점이면, 경로를 역추적해서 반환하고 종료
-    if current_node == end_node:
-        temp_path = []
-        current = current_node
-        while current is not None:
-            temp_path.append(current.position)
-            current = current.parent
-            
-        path = temp_path[::-1]
-        path_found = True
-        return # dijkstra_step 함수 종료
-    
-    # 4. 이웃 노드 생성 및 탐색
-    children = []
-    # 8방향에 대해 (상, 하, 좌, 우, 대각선)
-    for new_position in [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)]:
-        
-        # 노드 위치 계산
-        node_position = (current_node.position[0] + new_position[0], current_node.position[1] + new_position[1])
-
-        # 맵 범위 안에 있는지 확인
-        if node_position[0] > (len(grid) - 1) or node_position[0] < 0 or node_position[1] > (len(grid[0]) - 1) or node_position[1] < 0:
-            continue
-
-        # 벽(장애물)이 아닌지 확인
-        if grid[node_position[0]][node_position[1]] != 0:
-            continue
-
-        # 새로운 자식 노드 생성
-        new_node = Node(current_node, node_position)
-        children.append(new_node)
-
-    # 5. 자식 노드들을 순회하며 비용 계산 및 리스트에 추가
-    for child in children:
-
-        # 자식 노드가 visited_list에 있다면 건너뛰기
-        if child in visited_list:
-            continue
-
-        # movement_cost를 10 또는 14로 설정하는 로직
-        movement_cost = 10  # 기본값은 직선 비용으로 설정
-        
-        # 현재 노드와 자식 노드의 x, y 좌표가 모두 다른지 확인
-        if current_node.position[0] != child.position[0] and current_node.position[1] != child.position[1]:
-            movement_cost = 14 # x, y 좌표가 모두 다르면 대각선 이동
-
-        # g 비용 계산
-        child.g = current_node.g + movement_cost
-
-        # 자식 노드가 이미 unvisited_list에 있고, g 비용이 더 높은지 확인하는 로직
-        is_better_path = True
-        for open_node in unvisited_list:
-            if child == open_node and child.g >= open_node.g:
-                is_better_path = False
-                break
-        
-        if not is_better_path:
-            continue
-
-        # 위 모든 조건에 해당하지 않으면, unvisited_list에 자식 노드 추가
-        unvisited_list.append(child)
+    global path, path_found, search_done, expanded # 전역 변수 선언
+
+    # 탐색 제너레이터에서 EXPANSIONS_PER_STEP개의 이벤트를 꺼내서 화면 내용에 반영
+    for event in itertools.islice(search, EXPANSIONS_PER_STEP):
+        kind = event[0]
+        if kind == 'expand':
+            _, position, opened = event
+            expanded += 1
+            renderer.cells[position] = CLOSED # visited_list (빨강)
+            for child in opened:
+                renderer.cells[child] = OPEN # unvisited_list (파랑)
+        elif kind == 'found':
+            path = event[1]
+            path_found = True
+            search_done = True
+            for position in path:
+                renderer.cells[position] = FINAL
+            if BIDIRECTIONAL:
+                forward, backward = event[2]
+                print(f"경로 발견: 확장 노드 {expanded}개 (정방향 {forward}, 역방향 {backward})")
+            else:
+                print(f"경로 발견: 확장 노드 {expanded + 1}개") # 도착점 확장 포함
+        else: # 'failed'
+            search_done = True
+            print(f"경로 없음: 확장 노드 {expanded}개")
 
 # 메인 게임 루프를 위한 변수
 running = True 
 
+screen.fill(BLACK) #단색으로 채워 화면 지우기 (처음 한 번만, 그 뒤로는 바뀐 칸만 그림)
+scheduler = scheduler_BT.FixedTimestep(STEPS_PER_SECOND, FPS)
+
 while running: #게임 루프
-    screen.fill(BLACK) #단색으로 채워 화면 지우기
 
     #변수 업데이트
 
@@ -151,40 +116,19 @@ while running: #게임 루프
         if event.type == pygame.QUIT:
             running = False # 이 변수가 False가 되면 다음 프레임부터 루프가 멈춤
 
-    # Dijkstra 알고리즘 한 단계 실행
-    if not path_found: # 경로를 아직 못 찾았을 때만 알고리즘 실행
-        dijkstra_step()
-
-    #화면 그리기
-
-    for row_index in range(len(grid)):
-        for column_index in range(len(grid[0])):
-            rect = (CELL_SIZE * column_index, CELL_SIZE * row_index, CELL_SIZE, CELL_SIZE)
-            value = grid[row_index][column_index]
-            if value == 1:  # 벽
-                pygame.draw.rect(screen, GRAY, rect)
-            else:  # 길
-                pygame.draw.rect(screen, WHITE, rect, 1)
-
-    # 열린 리스트 (파랑)
-    for node in unvisited_list:
-        r, c = node.position
-        rect = (CELL_SIZE * c, CELL_SIZE * r, CELL_SIZE, CELL_SIZE)
-        pygame.draw.rect(screen, (0, 0, 255), rect)
-
-    # 닫힌 리스트 (빨강)
-    for node in visited_list:
-        r, c = node.position
-        rect = (CELL_SIZE * c, CELL_SIZE * r, CELL_SIZE, CELL_SIZE)
-        pygame.draw.rect(screen, (255, 0, 0), rect)
-
-    # 최종 경로 (초록)
-    if path:
-        for (r, c) in path:
-            rect = (CELL_SIZE * c, CELL_SIZE * r, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(screen, (0, 255, 0), rect)
-
-    pygame.display.update()
-    clock.tick(3)  # 속도 조절 (10 FPS)
+    # Dijkstra 알고리즘 단계 실행 (스케줄러가 정한 만큼, 화면 프레임과 따로)
+    if not search_done: # 탐색이 끝나지 않았을 때만 알고리즘 실행
+        for _ in scheduler.due_ticks():
+            dijkstra_step()
+            if search_done:
+                break
+
+    #화면 그리기 (지난 프레임과 달라진 타일만, 단계 수와 프레임 시간 표시)
+    if scheduler.should_render():
+        rects = renderer.draw(screen)
+        rects.append(scheduler.draw_counters(screen, (10, len(grid) * CELL_SIZE + 10)))
+        pygame.display.update(rects)
+        scheduler.frame_done()
+    scheduler.wait(idle = search_done)
 
 pygame.quit()
\ No newline at end of file
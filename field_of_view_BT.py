@@ -0,0 +1,107 @@
+import numpy as np
+
+WALL = 1
+UNKNOWN = 3
+
+# 8개 팔분면을 하나의 계산으로 처리하기 위한 좌표 변환 (xx, xy, yx, yy)
+OCTANTS = [
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+]
+
+class FieldOfView:
+    # 에이전트 시야: (2*radius+1) 정사각형
+    # line_of_sight=False: 정사각형 안을 모두 봄 (NumPy 슬라이싱으로 한 번에 복사)
+    # line_of_sight=True: 벽 뒤는 보이지 않음 (재귀 shadowcasting)
+    def __init__(self, radius=2, line_of_sight=False):
+        self.radius = radius
+        self.line_of_sight = line_of_sight
+
+    def update(self, grid, explore_map, position):
+        # 보이는 칸을 explore_map에 기록하고 (값이 바뀐 칸 목록, 처음 알게 된 칸 수)를 반환
+        if self.line_of_sight:
+            return self.update_visible(grid, explore_map, self.visible_cells(grid, position))
+        return self.update_square(grid, explore_map, position)
+
+    def update_square(self, grid, explore_map, position):
+        r, c = position
+        rows, cols = grid.shape
+        r0, r1 = max(r - self.radius, 0), min(r + self.radius + 1, rows)
+        c0, c1 = max(c - self.radius, 0), min(c + self.radius + 1, cols)
+
+        window = grid[r0:r1, c0:c1]
+        known = explore_map[r0:r1, c0:c1]
+
+        # 실제 값이 길(0), 벽(1), 아이템(2)이고 내 지도와 다른 칸만 기록
+        mask = (window != known) & (window <= 2)
+        if not mask.any():
+            return [], 0
+
+        newly_explored = int(np.count_nonzero(known[mask] == UNKNOWN))
+        known[mask] = window[mask]
+
+        changed_r, changed_c = np.nonzero(mask)
+        changed = list(zip((changed_r + r0).tolist(), (changed_c + c0).tolist()))
+        return changed, newly_explored
+
+    def update_visible(self, grid, explore_map, visible):
+        changed = []
+        newly_explored = 0
+        for (r, c) in sorted(visible):
+            value = grid[r, c]
+            old_value = explore_map[r, c]
+            if value <= 2 and old_value != value:
+                explore_map[r, c] = value
+                changed.append((r, c))
+                if old_value == UNKNOWN:
+                    newly_explored += 1
+        return changed, newly_explored
+
+    def visible_cells(self, grid, position):
+        # 재귀 shadowcasting으로 position에서 보이는 칸 집합 (벽 자체는 보이고, 그 뒤는 가려짐)
+        rows, cols = grid.shape
+        row, col = position
+        visible = {position}
+
+        def blocks(r, c):
+            return not (0 <= r < rows and 0 <= c < cols) or grid[r, c] == WALL
+
+        def cast_light(depth, start, end, xx, xy, yx, yy):
+            if start < end:
+                return
+            new_start = start
+            for j in range(depth, self.radius + 1):
+                blocked = False
+                dx = -j - 1
+                dy = -j
+                while dx <= 0:
+                    dx += 1
+                    c = col + dx * xx + dy * xy
+                    r = row + dx * yx + dy * yy
+                    left_slope = (dx - 0.5) / (dy + 0.5)
+                    right_slope = (dx + 0.5) / (dy - 0.5)
+                    if start < right_slope:
+                        continue
+                    if end > left_slope:
+                        break
+
+                    if 0 <= r < rows and 0 <= c < cols:
+                        visible.add((r, c))
+
+                    if blocked:
+                        if blocks(r, c):
+                            new_start = right_slope
+                            continue
+                        blocked = False
+                        start = new_start
+                    elif blocks(r, c) and j < self.radius:
+                        # 벽을 만나면 벽 앞쪽 구간을 한 단계 더 깊이 비추고, 벽 뒤는 가림
+                        blocked = True
+                        cast_light(j + 1, start, left_slope, xx, xy, yx, yy)
+                        new_start = right_slope
+                if blocked:
+                    break
+
+        for octant in OCTANTS:
+            cast_light(1, 1.0, 0.0, *octant)
+        return visible
@@ -0,0 +1,168 @@
+import heapq
+import math
+from A_star_BT import DIRECTIONS, MOVE_COSTS, flatten_grid, record_search
+
+INF = math.inf
+
+class FlowField:
+    # 고정된 도착점까지의 거리 지도 (도착점에서 거꾸로 한 번 Dijkstra)
+    # - 지도가 바뀌면 바뀐 칸 때문에 거리가 달라지는 칸만 다시 계산
+    # - 이동은 거리가 가장 많이 줄어드는 이웃으로 한 칸 (틱마다 이웃 8칸만 확인)
+    # - 같은 지도를 쓰는 에이전트들은 이 객체 하나를 같이 사용할 수 있음
+    def __init__(self, grid, goal):
+        self.grid = grid # 에이전트의 탐험 지도 (바뀐 칸의 값을 읽을 때 사용)
+        cells, self.rows, self.cols = flatten_grid(grid)
+
+        # D* Lite와 같이 바깥에 벽 한 줄을 두른 인덱스 (벽(1)만 막힌 칸, 미탐험(3)은 지나갈 수 있다고 가정)
+        self.width = self.cols + 2
+        size = (self.rows + 2) * self.width
+        self.blocked = bytearray([1]) * size
+        for r in range(self.rows):
+            row = cells[r * self.cols:(r + 1) * self.cols]
+            base = (r + 1) * self.width + 1
+            self.blocked[base:base + self.cols] = bytes(1 if value == 1 else 0 for value in row)
+
+        self.moves = [(move_r * self.width + move_c, movement_cost)
+                      for (move_r, move_c), movement_cost in zip(DIRECTIONS, MOVE_COSTS)]
+
+        self.goal = goal
+        self.goal_index = self.index_of(goal)
+        self.distance = [INF] * size # 도착점까지의 비용
+        self.parent = [-1] * size    # 최단 경로에서 다음 칸 (도착점 쪽)
+        self.pending = []            # 아직 반영하지 않은 바뀐 칸들
+
+        if not self.blocked[self.goal_index]:
+            self.distance[self.goal_index] = 0
+            self.propagate([(0, self.goal_index)])
+
+    def index_of(self, position):
+        return (position[0] + 1) * self.width + position[1] + 1
+
+    def position_of(self, index):
+        r, c = divmod(index, self.width)
+        return (r - 1, c - 1)
+
+    def update_cells(self, changed_cells):
+        # update_exploration_map에서 새로 드러난 칸들을 받아서, 막힘 여부가 바뀐 칸만 기록 (다음 질의 때 반영)
+        for (r, c) in changed_cells:
+            index = self.index_of((r, c))
+            value = 1 if self.grid[r][c] == 1 else 0
+            if self.blocked[index] != value:
+                self.blocked[index] = value
+                self.pending.append(index)
+
+    def propagate(self, seeds):
+        # seeds (거리, 칸)에서 시작하는 Dijkstra로 더 짧아진 거리를 퍼뜨림
+        distance = self.distance
+        parent = self.parent
+        blocked = self.blocked
+        moves = self.moves
+
+        open_list = list(seeds)
+        heapq.heapify(open_list)
+        expanded = 0
+        while open_list:
+            d, index = heapq.heappop(open_list)
+            if d != distance[index]:
+                continue # 오래된 항목
+            expanded += 1
+            for offset, movement_cost in moves:
+                neighbor = index + offset
+                if blocked[neighbor]:
+                    continue
+                value = d + movement_cost
+                if value < distance[neighbor]:
+                    distance[neighbor] = value
+                    parent[neighbor] = index
+                    heapq.heappush(open_list, (value, neighbor))
+        record_search(expanded)
+
+    def invalidate(self, indices):
+        # 막힌 칸을 지나서 도착점으로 가던 칸들(최단 경로 트리의 자손)의 거리를 지우고 목록을 반환
+        distance = self.distance
+        parent = self.parent
+        affected = []
+        stack = list(indices)
+        for index in stack:
+            distance[index] = INF
+            parent[index] = -1
+        while stack:
+            index = stack.pop()
+            affected.append(index)
+            for offset, _ in self.moves:
+                child = index + offset
+                if parent[child] == index:
+                    distance[child] = INF
+                    parent[child] = -1
+                    stack.append(child)
+        return affected
+
+    def repair(self):
+        # 새로 막힌 칸: 그 칸에 의존하던 칸들을 지우고 남은 이웃에서 다시 채움
+        # 새로 뚫린 칸: 이웃에서 거리를 구하고 더 짧아진 칸만 퍼뜨림
+        if not self.pending:
+            return
+        blocked = self.blocked
+        distance = self.distance
+        parent = self.parent
+
+        raised = [index for index in self.pending if blocked[index]]
+        lowered = [index for index in self.pending if not blocked[index]]
+        self.pending = []
+
+        seeds = []
+        for index in self.invalidate(raised) + lowered:
+            if blocked[index] or index == self.goal_index:
+                continue
+            best = distance[index]
+            best_parent = -1
+            for offset, movement_cost in self.moves:
+                neighbor = index + offset
+                if blocked[neighbor]:
+                    continue
+                value = distance[neighbor] + movement_cost
+                if value < best:
+                    best = value
+                    best_parent = neighbor
+            if best_parent != -1:
+                distance[index] = best
+                parent[index] = best_parent
+                seeds.append((best, index))
+        self.propagate(seeds)
+
+    def distance_to_goal(self, position):
+        self.repair()
+        return self.distance[self.index_of(position)]
+
+    def next_step(self, position):
+        # 거리가 가장 많이 줄어드는 이웃 칸 (도착점이면 그 자리, 도착점으로 갈 수 없으면 None)
+        self.repair()
+        index = self.index_of(position)
+        if index == self.goal_index:
+            return position
+        if self.distance[index] == INF:
+            return None
+
+        distance = self.distance
+        blocked = self.blocked
+        best = INF
+        best_index = None
+        for offset, movement_cost in self.moves:
+            neighbor = index + offset
+            if blocked[neighbor]:
+                continue
+            value = distance[neighbor] + movement_cost
+            if value < best:
+                best = value
+                best_index = neighbor
+        return self.position_of(best_index)
+
+    def descent(self, position, steps):
+        # position에서 거리 지도를 따라 내려가는 다음 steps 칸 (도착점이나 갈 수 없는 칸에서 멈춤)
+        route = []
+        while len(route) < steps and position != self.goal:
+            position = self.next_step(position)
+            if position is None:
+                break
+            route.append(position)
+        return route
@@ -0,0 +1,92 @@
+from A_star_BT import flatten_grid
+
+UNKNOWN = 3
+
+# NearestUnexploredArea의 BFS와 같은 이웃 순서 (행 -1, 0, 1 x 열 -1, 0, 1)
+NEIGHBOR_ORDER = [(move_r, move_c) for move_r in range(-1, 2) for move_c in range(-1, 2) if (move_r, move_c) != (0, 0)]
+
+class FrontierMap:
+    # 탐험 지도의 프런티어(미탐험 칸과 붙어 있는 알려진 길 칸) 집합과 미탐험 칸 수를
+    # update_exploration_map에서 바뀐 칸만 보고 갱신
+    def __init__(self, explore_map):
+        self.map = explore_map
+        cells, self.rows, self.cols = flatten_grid(explore_map)
+
+        # D* Lite와 같이 바깥에 벽 한 줄을 두른 인덱스를 사용해서 이웃 계산 때 범위 검사를 없앰
+        self.width = self.cols + 2
+        self.cells = bytearray([1]) * ((self.rows + 2) * self.width) # 탐험 지도 값의 복사본 (0, 1, 2, 3)
+        for r in range(self.rows):
+            base = (r + 1) * self.width + 1
+            self.cells[base:base + self.cols] = bytes(cells[r * self.cols:(r + 1) * self.cols])
+        self.unknown_count = self.cells.count(UNKNOWN)
+        self.offsets = [move_r * self.width + move_c for move_r, move_c in NEIGHBOR_ORDER]
+
+        self.frontier = set() # 벽을 두른 인덱스
+        for r in range(self.rows):
+            for index in range((r + 1) * self.width + 1, (r + 1) * self.width + 1 + self.cols):
+                self.refresh(index)
+
+    def refresh(self, index):
+        # 알려진 길(0) 또는 아이템(2)이면서 미탐험(3) 이웃이 있으면 프런티어
+        cells = self.cells
+        if cells[index] in (0, 2) and any(cells[index + offset] == UNKNOWN for offset in self.offsets):
+            self.frontier.add(index)
+        else:
+            self.frontier.discard(index)
+
+    def reveal(self, changed_cells):
+        # 바뀐 칸과 그 이웃만 프런티어 여부를 다시 계산
+        touched = set()
+        for (r, c) in changed_cells:
+            index = (r + 1) * self.width + c + 1
+            value = int(self.map[r][c])
+            if self.cells[index] == UNKNOWN and value != UNKNOWN:
+                self.unknown_count -= 1
+            self.cells[index] = value
+            touched.add(index)
+            touched.update(index + offset for offset in self.offsets)
+
+        for index in touched:
+            if self.cells[index] != 1: # 벽과 바깥 테두리는 프런티어가 아님
+                self.refresh(index)
+            else:
+                self.frontier.discard(index)
+
+    def has_unknown(self):
+        return self.unknown_count > 0
+
+    def nearest_unknown(self, start, avoid = None):
+        # start에서 알려진 길로만 BFS 해서 처음 만나는 미탐험 칸 (기존 BFS와 같은 순서)
+        # avoid: 지나가지 않을 칸 (그 칸 너머에 있는 미탐험 칸은 다른 길로 닿을 때만 고름)
+        # 프런티어가 비어 있으면 BFS 없이 바로 None
+        # 미로에서는 직선 거리가 가까운 프런티어 칸이 벽 너머에 있는 경우가 많아서, 프런티어 집합 쪽으로
+        # 향하는 A*도 이 BFS와 거의 같은 수의 칸을 확장함 -> BFS를 유지하고 칸마다 드는 비용만 줄임
+        if not self.frontier:
+            return None
+
+        cells = self.cells
+        frontier = self.frontier
+        offsets = self.offsets
+        width = self.width
+        start_index = (start[0] + 1) * width + start[1] + 1
+        queue = [start_index]
+        visited = {start_index}
+        if avoid is not None:
+            visited.add((avoid[0] + 1) * width + avoid[1] + 1)
+
+        for current in queue: # 리스트는 순회 중에 뒤에 추가한 칸까지 차례로 읽음 (popleft 없는 큐)
+            # 프런티어 칸이면 이웃 중 첫 번째 미탐험 칸이 목표
+            if current in frontier:
+                for offset in offsets:
+                    neighbor = current + offset
+                    if cells[neighbor] == UNKNOWN and neighbor not in visited:
+                        r, c = divmod(neighbor, width)
+                        return (r - 1, c - 1)
+
+            for offset in offsets:
+                neighbor = current + offset
+                if neighbor not in visited and cells[neighbor] in (0, 2):
+                    visited.add(neighbor)
+                    queue.append(neighbor)
+
+        return None
@@ -0,0 +1,89 @@
+import numpy as np
+# pygame은 그리기 함수 안에서만 import (헤드리스 실행에서는 이 모듈을 불러와도 pygame이 필요 없음)
+
+# 에이전트 화면 (Behavior Tree.py, replay_viewer.py) 색
+BLACK = (0, 0, 0)
+WALL_COLOR = (128, 128, 128)
+PATH_COLOR = (255, 255, 255)
+ITEM_COLOR = (0, 255, 0)
+AGENT_COLOR = (255, 0, 0)
+
+# 에이전트 화면의 팔레트 번호
+UNKNOWN, PATH, WALL, ITEM, AGENT = range(5)
+AGENT_PALETTE = [BLACK, PATH_COLOR, WALL_COLOR, ITEM_COLOR, AGENT_COLOR]
+
+# 탐험 지도 값 (0: 길, 1: 벽, 2: 아이템을 본 칸, 3: 미탐험) -> 팔레트 번호
+# 지도의 아이템 칸은 검은 배경이고, 아이템은 실제 grid 기준으로 위에 그림
+MAP_TO_PALETTE = np.array([PATH, WALL, UNKNOWN, UNKNOWN], dtype=np.uint8)
+
+def compose_agent_view(cells, explore_map, world, position):
+    # 실시간 화면과 같은 그림: 탐험 지도, 그 위에 남은 아이템, 에이전트
+    np.take(MAP_TO_PALETTE, explore_map, out=cells)
+    cells[world == 2] = ITEM
+    cells[position] = AGENT
+    return cells
+
+class GridRenderer:
+    # 격자를 팔레트 번호 배열(cells)로 들고 있다가 pygame.surfarray로 한 번에 그림
+    # 지난 프레임과 달라진 타일만 다시 그려서, 맵이 커져도 프레임 비용이 바뀐 부분에 비례
+    def __init__(self, rows, cols, cell_size, palette, outlined=(), tile=16, origin=(0, 0)):
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        self.tile = tile # 다시 그리는 단위 (tile x tile 칸)
+        self.origin = origin
+
+        # 팔레트 번호 -> cell_size x cell_size 그림 (outlined 번호는 pygame.draw.rect(..., 1) 처럼 테두리만)
+        self.sprites = np.zeros((len(palette), cell_size, cell_size, 3), dtype=np.uint8)
+        for index, color in enumerate(palette):
+            if index in outlined:
+                for edge in (self.sprites[index, 0], self.sprites[index, -1],
+                             self.sprites[index, :, 0], self.sprites[index, :, -1]):
+                    edge[:] = color
+            else:
+                self.sprites[index] = color
+
+        self.cells = np.zeros((rows, cols), dtype=np.uint8) # 이번 프레임에 그릴 내용 (호출하는 쪽에서 수정)
+        self.drawn = None # 화면에 그려져 있는 내용 (None이면 처음이므로 전부 그림)
+        self.surface = None
+
+    def pixels(self, r0, r1, c0, c1):
+        # 칸 영역을 (너비, 높이, 3) 픽셀 배열로 (surfarray는 x축이 먼저)
+        block = self.sprites[self.cells[r0:r1, c0:c1]] # (행, 열, 픽셀 y, 픽셀 x, 3)
+        rows, cols = r1 - r0, c1 - c0
+        return block.transpose(1, 3, 0, 2, 4).reshape(cols * self.cell_size, rows * self.cell_size, 3)
+
+    def dirty_tiles(self):
+        # 다시 그려야 할 타일의 왼쪽 위 칸 (row, col) 목록
+        if self.drawn is None:
+            return [(r, c) for r in range(0, self.rows, self.tile) for c in range(0, self.cols, self.tile)]
+        changed_r, changed_c = np.nonzero(self.cells != self.drawn)
+        tiles_per_row = (self.cols + self.tile - 1) // self.tile
+        keys = np.unique((changed_r // self.tile) * tiles_per_row + changed_c // self.tile)
+        return [(key // tiles_per_row * self.tile, key % tiles_per_row * self.tile) for key in keys.tolist()]
+
+    def draw(self, screen):
+        # 바뀐 타일만 screen에 그리고, pygame.display.update()에 넘길 사각형 목록을 반환
+        import pygame
+
+        if self.surface is None:
+            self.surface = pygame.Surface((self.cols * self.cell_size, self.rows * self.cell_size))
+
+        size = self.cell_size
+        rects = []
+        for r0, c0 in self.dirty_tiles():
+            r1, c1 = min(r0 + self.tile, self.rows), min(c0 + self.tile, self.cols)
+            area = pygame.Rect(c0 * size, r0 * size, (c1 - c0) * size, (r1 - r0) * size)
+            pygame.surfarray.blit_array(self.surface.subsurface(area), self.pixels(r0, r1, c0, c1))
+            screen.blit(self.surface, area.move(self.origin), area)
+            rects.append(area.move(self.origin))
+
+        if self.drawn is None:
+            self.drawn = self.cells.copy()
+        else:
+            np.copyto(self.drawn, self.cells)
+        return rects
+
+    def invalidate(self):
+        # 화면 전체를 다른 것으로 덮었을 때 다음 draw()에서 전부 다시 그리도록 함
+        self.drawn = None
@@ -0,0 +1,177 @@
+import heapq
+import os
+import sys
+import zlib
+import numpy as np
+import A_star_BT
+from A_star_BT import DIRECTIONS, MOVE_COSTS, flatten_grid
+
+# 도달할 수 없는 칸의 거리 값
+UNREACHABLE = np.iinfo(np.int32).max
+
+def landmark_path(csv_path):
+    # 'maze_grid.csv' -> 'maze_grid_landmarks.npy' (CSV와 같은 폴더에 저장)
+    return os.path.splitext(csv_path)[0] + '_landmarks.npy'
+
+def landmark_meta_path(csv_path):
+    # 'maze_grid.csv' -> 'maze_grid_landmarks_meta.npy' (테이블을 만든 grid 크기와 CSV 해시)
+    return os.path.splitext(csv_path)[0] + '_landmarks_meta.npy'
+
+def grid_signature(csv_path, rows, cols):
+    # [rows, cols, CSV 내용의 crc32] -> CSV가 바뀌면 값이 달라짐
+    with open(csv_path, 'rb') as f:
+        checksum = zlib.crc32(f.read())
+    return np.array([rows, cols, checksum], dtype=np.int64)
+
+def dijkstra_distances(cells, rows, cols, source):
+    # source 한 칸에서 모든 칸까지의 최단 비용 (직선 10, 대각선 14)
+    dist = [UNREACHABLE] * (rows * cols)
+    dist[source] = 0
+    open_list = [(0, source)]
+
+    while open_list:
+        d, index = heapq.heappop(open_list)
+        if d > dist[index]:
+            continue
+
+        r, c = divmod(index, cols)
+        for (move_r, move_c), movement_cost in zip(DIRECTIONS, MOVE_COSTS):
+            nr = r + move_r
+            nc = c + move_c
+            if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                continue
+            neighbor = nr * cols + nc
+            if cells[neighbor] == 1:
+                continue
+            nd = d + movement_cost
+            if nd < dist[neighbor]:
+                dist[neighbor] = nd
+                heapq.heappush(open_list, (nd, neighbor))
+
+    return dist
+
+def select_landmarks(cells, rows, cols, k):
+    # 가장 먼 점 고르기: 이미 고른 랜드마크들에서 가장 멀리 떨어진 길 칸을 다음 랜드마크로 선택
+    free_cells = [index for index, value in enumerate(cells) if value != 1]
+    if not free_cells:
+        return [], []
+
+    landmarks = []
+    tables = []
+    nearest = None
+    current = free_cells[0]
+
+    for _ in range(k):
+        if current in landmarks:
+            break
+        dist = dijkstra_distances(cells, rows, cols, current)
+        landmarks.append(current)
+        tables.append(dist)
+
+        # 각 칸에서 가장 가까운 랜드마크까지의 거리 중 가장 큰 칸
+        if nearest is None:
+            nearest = list(dist)
+        else:
+            nearest = [min(a, b) for a, b in zip(nearest, dist)]
+        reachable = [index for index in free_cells if nearest[index] != UNREACHABLE]
+        unreachable = [index for index in free_cells if nearest[index] == UNREACHABLE]
+        # 다른 연결 영역이 남아 있으면 그쪽에 먼저 랜드마크를 둠
+        current = unreachable[0] if unreachable else max(reachable, key=lambda index: nearest[index])
+
+    return landmarks, tables
+
+def build_landmarks(csv_path='maze_grid.csv', k=8):
+    # 오프라인 단계: 랜드마크 K개를 고르고 거리 테이블을 CSV 옆에 저장
+    grid = np.loadtxt(csv_path, delimiter=',', dtype=int)
+    cells, rows, cols = flatten_grid(grid)
+
+    landmarks, tables = select_landmarks(cells, rows, cols, k)
+    table = np.array(tables, dtype=np.int32).reshape(len(tables), rows, cols)
+
+    np.save(landmark_path(csv_path), table)
+    np.save(landmark_meta_path(csv_path), grid_signature(csv_path, rows, cols))
+    return [divmod(index, cols) for index in landmarks]
+
+def load_landmarks(csv_path='maze_grid.csv'):
+    # 거리 테이블을 메모리 매핑으로 열기 (없으면 None)
+    # 저장된 grid 크기/CSV 해시가 지금 CSV와 다르면 (미로를 다시 만든 경우) 같은 K로 다시 만들어서 엶
+    path = landmark_path(csv_path)
+    if not os.path.exists(path):
+        return None
+    table = np.load(path, mmap_mode='r')
+
+    meta_path = landmark_meta_path(csv_path)
+    stored = np.load(meta_path) if os.path.exists(meta_path) else None
+    rows, cols = table.shape[1], table.shape[2]
+    if stored is None or not np.array_equal(stored, grid_signature(csv_path, rows, cols)):
+        k = table.shape[0]
+        del table # 덮어쓰기 전에 메모리 매핑 닫기
+        build_landmarks(csv_path, k)
+        table = np.load(path, mmap_mode='r')
+    return table
+
+class LandmarkHeuristic:
+    # 도착점 end에 대한 휴리스틱 테이블 (랜드마크 삼각 부등식과 대각선 거리 중 큰 값)
+    # 탐색이 칸을 열 때 그 칸의 열(table[:, index])만 읽어서 계산하고 기억함
+    # -> 메모리 매핑된 테이블을 질의마다 통째로 읽지 않음
+    # 주의: 테이블은 실제 grid 기준이므로, 미탐험 칸을 길로 보는 agent.map에서는 과대평가될 수 있음
+    def __init__(self, table, end, rows, cols):
+        self.distances = np.asarray(table).reshape(table.shape[0], rows * cols) # 복사 없이 보기만 바꿈
+        self.to_end = self.distances[:, end[0] * cols + end[1]].tolist()
+        self.end_r, self.end_c = end
+        self.cols = cols
+        self.values = {} # 셀 인덱스 -> 휴리스틱 값
+
+    def __getitem__(self, index):
+        value = self.values.get(index)
+        if value is not None:
+            return value
+
+        bound = 0
+        for distance, to_end in zip(self.distances[:, index].tolist(), self.to_end):
+            if distance != UNREACHABLE and to_end != UNREACHABLE:
+                diff = distance - to_end if distance > to_end else to_end - distance
+                if diff > bound:
+                    bound = diff
+
+        r, c = divmod(index, self.cols)
+        value = max(bound, A_star_BT.octile_cost(r, c, self.end_r, self.end_c))
+        self.values[index] = value
+        return value
+
+def landmark_heuristic(table, end, rows, cols):
+    # 도착점 end에 대한 휴리스틱 테이블 (칸마다 필요할 때 계산)
+    return LandmarkHeuristic(table, end, rows, cols)
+
+def path_cost(path):
+    if path is None:
+        return None
+    return sum(A_star_BT.octile_cost(r1, c1, r2, c2) for (r1, c1), (r2, c2) in zip(path, path[1:]))
+
+def compare_heuristics(start, end, grid, table):
+    # 같은 질의를 대각선 거리 / 랜드마크 휴리스틱으로 풀어서 확장 노드 수 비교
+    octile_cost = path_cost(A_star_BT.astar(start, end, grid))
+    octile_expanded = A_star_BT.search_stats['last_expanded']
+    landmark_cost = path_cost(A_star_BT.astar(start, end, grid, landmarks=table))
+    landmark_expanded = A_star_BT.search_stats['last_expanded']
+
+    return {
+        'octile_expanded': octile_expanded,
+        'landmark_expanded': landmark_expanded,
+        'saved': octile_expanded - landmark_expanded,
+        'same_cost': octile_cost == landmark_cost,
+    }
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'maze_grid.csv'
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    positions = build_landmarks(csv_path, k)
+    print(f"랜드마크 {len(positions)}개 저장 완료: {landmark_path(csv_path)}")
+    print("랜드마크 위치:", positions)
+
+    grid = np.loadtxt(csv_path, delimiter=',', dtype=int)
+    table = load_landmarks(csv_path)
+    result = compare_heuristics((0, 0), (len(grid) - 1, len(grid[0]) - 1), grid, table)
+    print(f"확장 노드 수: 대각선 거리 {result['octile_expanded']} -> 랜드마크 {result['landmark_expanded']} "
+          f"({result['saved']}개 감소)")
@@ -1,5 +1,8 @@
+import argparse
+import os
 import random
 import csv
+import struct
 
 WIDTH = 50
 HEIGHT = 50
@@ -10,65 +13,276 @@ ITEM = 2
 # 아이템 생성 확률 (경로 칸 중 5%를 아이템으로 변경)
 ITEM_PROBABILITY = 0.005
 
-# 모든 칸을 벽(1)으로 채운 50x50 그리드 생성
-grid = [[WALL for _ in range(WIDTH)] for _ in range(HEIGHT)]
-
-stack = []
-visited = set()
-
-# 시작점
-start_x = random.randrange(0, WIDTH, 2)
-start_y = random.randrange(0, HEIGHT, 2)
-
-grid[start_y][start_x] = PATH
-stack.append((start_x, start_y))
-visited.add((start_x, start_y))
-
-while stack:
-    cx, cy = stack[-1]  # 현재 위치 (스택의 top)
-    
-    # 방문 가능한 이웃 칸 탐색 (2칸씩 이동)
-    neighbors = []
-    # (dx, dy)는 (동, 서, 남, 북) 방향으로 2칸 이동
-    for (dx, dy) in [(0, 2), (0, -2), (2, 0), (-2, 0)]:
-        nx, ny = cx + dx, cy + dy
-        
-        # 그리드 범위 내에 있고 아직 방문하지 않았다면
-        if 0 <= nx < WIDTH and 0 <= ny < HEIGHT and (nx, ny) not in visited:
-            neighbors.append((nx, ny))
-            
-    if neighbors:
-        # 방문할 이웃이 있다면
-        nx, ny = random.choice(neighbors)  # 이웃 중 하나를 무작위로 선택
-        
-        # 현재 위치와 다음 위치 사이의 벽을 허뭄 (PATH, 0으로 설정)
-        # (nx - cx) // 2 는 dx를 2로 나눈 값 (즉, 1 또는 -1)
-        wx, wy = cx + (nx - cx) // 2, cy + (ny - cy) // 2
-        grid[wy][wx] = PATH
-        
-        # 다음 위치를 길(PATH, 0)로 설정
-        grid[ny][nx] = PATH
-        
-        # 다음 위치를 방문처리하고 스택에 추가
-        visited.add((nx, ny))
-        stack.append((nx, ny))
-    else:
-        # 방문할 이웃이 더 이상 없다면 (막다른 길)
-        stack.pop()  # 스택에서 제거 (되돌아가기)
-
-for y in range(HEIGHT):
-    for x in range(WIDTH):
-        # 현재 칸이 길(0)이라면
-        if grid[y][x] == PATH:
-            # 설정된 확률(ITEM_PROBABILITY)에 따라 아이템(2)으로 변경
-            if random.random() < ITEM_PROBABILITY:
-                grid[y][x] = ITEM
-
-try:
-    with open('maze_grid.csv', 'w', newline='', encoding='utf-8') as f:
+# 바이너리 미로 파일: 32바이트 헤더 (매직, 너비, 높이, 시드, 아이템 수) + 칸마다 uint8 한 바이트
+BINARY_MAGIC = b'MAZ1'
+BINARY_HEADER = struct.Struct('<4sIIqQ4x')
+
+def generate_dfs(width=WIDTH, height=HEIGHT, seed=None):
+    # 깊이 우선 탐색(DFS) 미로. 전체 grid를 메모리에 만들어서 반환
+    rng = random.Random(seed)
+
+    # 모든 칸을 벽(1)으로 채운 그리드 생성
+    grid = [[WALL for _ in range(width)] for _ in range(height)]
+
+    stack = []
+    visited = set()
+
+    # 시작점
+    start_x = rng.randrange(0, width, 2)
+    start_y = rng.randrange(0, height, 2)
+
+    grid[start_y][start_x] = PATH
+    stack.append((start_x, start_y))
+    visited.add((start_x, start_y))
+
+    while stack:
+        cx, cy = stack[-1]  # 현재 위치 (스택의 top)
+
+        # 방문 가능한 이웃 칸 탐색 (2칸씩 이동)
+        neighbors = []
+        # (dx, dy)는 (동, 서, 남, 북) 방향으로 2칸 이동
+        for (dx, dy) in [(0, 2), (0, -2), (2, 0), (-2, 0)]:
+            nx, ny = cx + dx, cy + dy
+
+            # 그리드 범위 내에 있고 아직 방문하지 않았다면
+            if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in visited:
+                neighbors.append((nx, ny))
+
+        if neighbors:
+            # 방문할 이웃이 있다면
+            nx, ny = rng.choice(neighbors)  # 이웃 중 하나를 무작위로 선택
+
+            # 현재 위치와 다음 위치 사이의 벽을 허뭄 (PATH, 0으로 설정)
+            # (nx - cx) // 2 는 dx를 2로 나눈 값 (즉, 1 또는 -1)
+            wx, wy = cx + (nx - cx) // 2, cy + (ny - cy) // 2
+            grid[wy][wx] = PATH
+
+            # 다음 위치를 길(PATH, 0)로 설정
+            grid[ny][nx] = PATH
+
+            # 다음 위치를 방문처리하고 스택에 추가
+            visited.add((nx, ny))
+            stack.append((nx, ny))
+        else:
+            # 방문할 이웃이 더 이상 없다면 (막다른 길)
+            stack.pop()  # 스택에서 제거 (되돌아가기)
+
+    for y in range(height):
+        for x in range(width):
+            # 현재 칸이 길(0)이라면
+            if grid[y][x] == PATH:
+                # 설정된 확률(ITEM_PROBABILITY)에 따라 아이템(2)으로 변경
+                if rng.random() < ITEM_PROBABILITY:
+                    grid[y][x] = ITEM
+
+    return grid
+
+def place_items(row, rng):
+    # 한 줄의 길(0) 칸에 확률적으로 아이템(2)을 놓고, 놓은 개수를 반환
+    count = 0
+    for x in range(len(row)):
+        if row[x] == PATH and rng.random() < ITEM_PROBABILITY:
+            row[x] = ITEM
+            count += 1
+    return count
+
+def generate_eller_rows(width, height, seed=None):
+    # Eller 알고리즘으로 미로를 한 줄씩 만들어서 내보냄 (메모리는 O(width))
+    # DFS 미로와 같은 모양: 짝수 (행, 열)이 방, 그 사이 칸이 벽 또는 통로
+    rng = random.Random(seed)
+    room_cols = (width + 1) // 2
+    room_rows = (height + 1) // 2
+
+    # 각 방이 속한 집합 번호와, 집합별 방 목록
+    sets = list(range(room_cols))
+    members = {label: [x] for x, label in enumerate(sets)}
+    next_label = room_cols
+
+    def merge(a, b):
+        # 작은 집합을 큰 집합에 합침
+        if len(members[a]) < len(members[b]):
+            a, b = b, a
+        for x in members[b]:
+            sets[x] = a
+        members[a].extend(members.pop(b))
+
+    for room_row in range(room_rows):
+        last = room_row == room_rows - 1
+
+        # 1. 가로로 이웃한 방을 무작위로 연결 (마지막 줄은 다른 집합이면 모두 연결)
+        row = [WALL] * width
+        row[0] = PATH
+        for x in range(1, room_cols):
+            row[2 * x] = PATH
+            if sets[x] != sets[x - 1] and (last or rng.random() < 0.5):
+                merge(sets[x - 1], sets[x])
+                row[2 * x - 1] = PATH
+        yield row
+
+        if last:
+            break
+
+        # 2. 집합마다 적어도 한 방은 아래로 연결
+        down = [False] * room_cols
+        for label, xs in members.items():
+            chosen = [x for x in xs if rng.random() < 0.5]
+            if not chosen:
+                chosen = [rng.choice(xs)]
+            for x in chosen:
+                down[x] = True
+
+        wall_row = [WALL] * width
+        for x in range(room_cols):
+            if down[x]:
+                wall_row[2 * x] = PATH
+        yield wall_row
+
+        # 3. 아래로 연결되지 않은 방은 다음 줄에서 새 집합으로 시작
+        members = {}
+        for x in range(room_cols):
+            if not down[x]:
+                sets[x] = next_label
+                next_label += 1
+            members.setdefault(sets[x], []).append(x)
+
+    # 높이가 짝수면 마지막 줄은 DFS 미로처럼 벽
+    if height % 2 == 0:
+        yield [WALL] * width
+
+def binary_path(csv_path):
+    # 'maze_grid.csv' -> 'maze_grid.bin'
+    return os.path.splitext(csv_path)[0] + '.bin'
+
+def write_header(f, width, height, seed, item_count):
+    f.seek(0)
+    f.write(BINARY_HEADER.pack(BINARY_MAGIC, width, height, -1 if seed is None else seed, item_count))
+
+def write_streaming(path, width, height, seed=None, binary=None, write_text=True):
+    # 한 줄씩 만들어서 바로 CSV(와 바이너리)에 쓰고 아이템도 같은 패스에서 배치 (전체 grid를 메모리에 두지 않음)
+    rng = random.Random(None if seed is None else seed + 1)
+    item_count = 0
+
+    csv_file = open(path, 'w', newline='', encoding='utf-8') if write_text else None
+    bin_file = open(binary, 'wb') if binary else None
+    try:
+        writer = csv.writer(csv_file) if csv_file else None
+        if bin_file:
+            write_header(bin_file, width, height, seed, 0) # 아이템 수는 끝나고 다시 기록
+
+        for row in generate_eller_rows(width, height, seed):
+            item_count += place_items(row, rng)
+            if writer:
+                writer.writerow(row)
+            if bin_file:
+                bin_file.write(bytes(row))
+
+        if bin_file:
+            write_header(bin_file, width, height, seed, item_count)
+    finally:
+        if csv_file:
+            csv_file.close()
+        if bin_file:
+            bin_file.close()
+
+    return item_count
+
+def write_csv(grid, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
         writer.writerows(grid)
-    print("50x50 미로 그리드 생성 완료. 'maze_grid.csv' 파일로 저장되었습니다.")
-    print("0: 길, 1: 벽, 2: 아이템")
-except Exception as e:
-    print(f"파일 저장 중 오류 발생: {e}")
\ No newline at end of file
+
+def write_binary(grid, path, seed=None):
+    height = len(grid)
+    width = len(grid[0]) if height > 0 else 0
+    item_count = sum(row.count(ITEM) for row in grid)
+    with open(path, 'wb') as f:
+        write_header(f, width, height, seed, item_count)
+        for row in grid:
+            f.write(bytes(row))
+
+def convert_csv(csv_path, path=None):
+    # 이미 있는 CSV 미로를 한 줄씩 읽어서 바이너리로 변환
+    path = path or binary_path(csv_path)
+    width = height = item_count = 0
+    with open(csv_path, newline='', encoding='utf-8') as src, open(path, 'wb') as f:
+        write_header(f, 0, 0, None, 0)
+        for row in csv.reader(src):
+            cells = [int(value) for value in row]
+            width = len(cells)
+            height += 1
+            item_count += cells.count(ITEM)
+            f.write(bytes(cells))
+        write_header(f, width, height, None, item_count)
+    return path
+
+def read_header(path):
+    # 바이너리 미로 파일의 헤더를 딕셔너리로 반환
+    with open(path, 'rb') as f:
+        magic, width, height, seed, item_count = BINARY_HEADER.unpack(f.read(BINARY_HEADER.size))
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"'{path}'는 미로 바이너리 파일이 아닙니다.")
+    return {'width': width, 'height': height, 'seed': None if seed == -1 else seed, 'item_count': item_count}
+
+def load_binary(path, mode='c'):
+    # 바이너리 미로를 np.memmap으로 열기 (파싱 없이 바로 사용, 프로세스 간 공유 가능)
+    # mode='c'는 copy-on-write: 아이템을 주워도 파일은 바뀌지 않음
+    import numpy as np
+
+    header = read_header(path)
+    grid = np.memmap(path, dtype=np.uint8, mode=mode, offset=BINARY_HEADER.size,
+                     shape=(header['height'], header['width']))
+    return grid, header
+
+def binary_is_stale(csv_path):
+    # CSV가 바이너리보다 나중에 수정됐으면 (CSV만 다시 만들거나 고친 경우) 바이너리는 옛 미로
+    path = binary_path(csv_path)
+    return os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(path)
+
+def load_grid(csv_path='maze_grid.csv'):
+    # 바이너리 미로가 있으면 memmap으로 바로 열고, 없을 때만 CSV를 파싱
+    # 바이너리가 CSV보다 오래됐으면 CSV에서 다시 변환해서 엶 (변환할 수 없으면 CSV를 파싱)
+    import numpy as np
+
+    path = binary_path(csv_path)
+    if os.path.exists(path):
+        if binary_is_stale(csv_path):
+            try:
+                convert_csv(csv_path, path)
+            except OSError:
+                return np.loadtxt(csv_path, delimiter=',', dtype=int)
+        grid, _ = load_binary(path)
+        return grid
+    return np.loadtxt(csv_path, delimiter=',', dtype=int)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="미로 그리드 생성")
+    parser.add_argument('--width', type=int, default=WIDTH)
+    parser.add_argument('--height', type=int, default=HEIGHT)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--stream', action='store_true', help="Eller 알고리즘으로 한 줄씩 생성 (큰 미로용)")
+    parser.add_argument('--output', default='maze_grid.csv')
+    parser.add_argument('--no-csv', action='store_true', help="바이너리 파일만 저장 (아주 큰 미로용)")
+    parser.add_argument('--convert', action='store_true', help="--output의 기존 CSV를 바이너리로 변환만 함")
+    args = parser.parse_args()
+
+    bin_output = binary_path(args.output)
+    try:
+        if args.convert:
+            convert_csv(args.output)
+            print(f"'{args.output}' 파일을 바이너리로 변환했습니다.")
+        elif args.stream:
+            items = write_streaming(args.output, args.width, args.height, args.seed,
+                                    binary = bin_output, write_text = not args.no_csv)
+            print(f"{args.width}x{args.height} 미로 그리드 생성 완료 (아이템 {items}개).")
+        else:
+            grid = generate_dfs(args.width, args.height, args.seed)
+            if not args.no_csv:
+                write_csv(grid, args.output)
+            write_binary(grid, bin_output, args.seed)
+            print(f"{args.width}x{args.height} 미로 그리드 생성 완료.")
+        if not args.no_csv and not args.convert:
+            print(f"'{args.output}' 파일로 저장되었습니다.")
+        print(f"'{bin_output}' 바이너리 파일로 저장되었습니다.")
+        print("0: 길, 1: 벽, 2: 아이템")
+    except Exception as e:
+        print(f"파일 저장 중 오류 발생: {e}")
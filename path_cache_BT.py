@@ -0,0 +1,100 @@
+from collections import OrderedDict
+
+class PathCache:
+    # (시작점, 도착점)을 key로 경로를 기억하는 LRU 캐시 (모든 경로는 self.version 지도에서 유효)
+    # 지도 버전이 바뀌면 이전 버전의 경로는 절대 돌려주지 않는다.
+    # 새로 막힌 칸만 있는 버전 변경은 advance()로 알려주면 그 칸을 지나는 경로만 버림
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.paths = OrderedDict()   # (start, goal) -> 경로
+        self.suffixes = {}           # goal -> {경로 위의 칸: (key, 경로 안의 위치)}
+        self.through = {}            # 칸 -> 그 칸을 지나는 경로의 key 집합
+        self.version = None
+
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.paths.clear()
+        self.suffixes.clear()
+        self.through.clear()
+
+    def check_version(self, version):
+        # 버전은 늘어나기만 하므로, advance()로 옮겨오지 않은 새 버전이 오면 예전 경로는 모두 버림
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def advance(self, version, blocked_cells):
+        # 길이던 칸이 막히기만 한 버전 변경: 막힌 칸을 지나지 않는 경로는 새 지도에서도 그대로 최단 경로
+        # (막힌 칸이 생기면 다른 경로의 비용은 늘어나기만 하므로)
+        if version == self.version:
+            return
+        for cell in blocked_cells:
+            for key in list(self.through.get(cell, ())):
+                self.remove(key)
+        self.version = version
+
+    def get(self, start, goal, version):
+        self.check_version(version)
+
+        key = (start, goal)
+        path = self.paths.get(key)
+        if path is not None:
+            self.paths.move_to_end(key)
+            self.hits += 1
+            return path
+
+        # 같은 도착점으로 가는 캐시 경로 위에 start가 있으면 그 뒷부분을 재사용
+        cells = self.suffixes.get(goal)
+        if cells and start in cells:
+            path_key, offset = cells[start]
+            path = self.paths.get(path_key)
+            if path is not None:
+                self.paths.move_to_end(path_key)
+                self.suffix_hits += 1
+                return path[offset:]
+
+        self.misses += 1
+        return None
+
+    def put(self, start, goal, version, path):
+        self.check_version(version)
+
+        key = (start, goal)
+        if key in self.paths:
+            self.remove(key)
+
+        self.paths[key] = path
+        cells = self.suffixes.setdefault(goal, {})
+        for offset, cell in enumerate(path):
+            cells.setdefault(cell, (key, offset))
+            self.through.setdefault(cell, set()).add(key)
+
+        # 가장 오래 쓰지 않은 경로부터 제거
+        while len(self.paths) > self.max_size:
+            self.remove(next(iter(self.paths)))
+
+    def remove(self, key):
+        path = self.paths.pop(key)
+        for cell in path:
+            keys = self.through.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.through[cell]
+
+        _, goal = key
+        cells = self.suffixes.get(goal)
+        if cells is None:
+            return
+
+        for cell in path:
+            if cells.get(cell, (None,))[0] == key:
+                del cells[cell]
+        if not cells:
+            del self.suffixes[goal]
+
+    def stats(self):
+        return {'hits': self.hits, 'suffix_hits': self.suffix_hits, 'misses': self.misses, 'size': len(self.paths)}
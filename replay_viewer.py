@@ -0,0 +1,226 @@
+import argparse
+import csv
+import numpy as np
+import agent_log_BT
+import field_of_view_BT
+import grid_renderer_BT
+from grid_renderer_BT import BLACK, WALL_COLOR, PATH_COLOR, AGENT_COLOR
+import maze_grid
+# pygame은 화면을 띄울 때만 view() 안에서 import
+
+CELL_SIZE = 10
+TIMELINE_HEIGHT = 20
+HUD_HEIGHT = 40
+
+def parse_target(text):
+    if text == 'None':
+        return (-1, -1)
+    r, c = text.strip('()').split(',')
+    return (int(r), int(c))
+
+def read_csv_log(path):
+    # CSV 로그를 바이너리 로그와 같은 {열 이름: 배열} 형태로 읽음
+    names = {'action': [], 'status': []}
+    codes = {'action': {}, 'status': {}}
+    rows = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for tick, r, c, action, target, status, items, _ in reader:
+            encoded = []
+            for kind, name in (('action', action), ('status', status)):
+                if name not in codes[kind]:
+                    codes[kind][name] = len(names[kind])
+                    names[kind].append(name)
+                encoded.append(codes[kind][name])
+            target_r, target_c = parse_target(target)
+            rows.append((int(tick), int(r), int(c), encoded[0], target_r, target_c, encoded[1], int(items)))
+
+    data = np.array(rows, dtype=np.int64).reshape(-1, 8)
+    columns = {name: data[:, i] for i, name in
+               enumerate(['tick', 'row', 'col', 'action', 'target_row', 'target_col', 'status', 'items'])}
+    return columns, names
+
+def read_columns(path):
+    if path.endswith('.bin'):
+        columns, names, _ = agent_log_BT.read_log(path)
+        return columns, names
+    return read_csv_log(path)
+
+class ReplayIndex:
+    # 로그의 위치 기록만으로 탐험 지도를 다시 만들어서 임의의 틱으로 바로 이동
+    # - interval 틱마다 탐험 지도와 월드(아이템 상태)의 키프레임을 저장
+    # - 그 사이 틱은 바뀐 칸(델타)만 저장
+    # -> 어떤 틱이든 키프레임 복사 + 최대 interval 틱의 델타 적용 (경로 탐색은 다시 하지 않음)
+    def __init__(self, columns, names, grid, start=(0, 0), vision_radius=2, line_of_sight=False, interval=64):
+        self.columns = columns
+        self.actions = names['action']
+        self.statuses = names['status']
+        self.rows, self.cols = grid.shape
+        self.interval = interval
+        self.count = len(columns['tick'])
+
+        # 틱 번호 -> 로그의 행 번호 (로그에 없는 틱은 -1)
+        ticks = columns['tick']
+        self.row_of_tick = np.full(int(ticks.max()) + 1 if self.count else 0, -1, dtype=np.int64)
+        self.row_of_tick[ticks] = np.arange(self.count)
+
+        self.build(np.array(grid, dtype=np.uint8), start, field_of_view_BT.FieldOfView(vision_radius, line_of_sight))
+
+        self.map = np.empty((self.rows, self.cols), dtype=np.uint8) # state_at()이 돌려주는 작업용 배열
+        self.world = np.empty((self.rows, self.cols), dtype=np.uint8)
+
+    def build(self, world, start, view):
+        explore_map = np.full_like(world, 3)
+        positions = list(zip(self.columns['row'].tolist(), self.columns['col'].tolist()))
+        items = self.columns['items'].tolist()
+
+        delta_cells = []
+        delta_values = []
+        self.delta_offsets = [0] # i번째 행의 델타: delta_offsets[i] ~ delta_offsets[i + 1]
+        self.pickups = np.full(self.count, -1, dtype=np.int64) # 그 행에서 주운 아이템 칸 (없으면 -1)
+        self.keyframes = []
+
+        # 한 틱: 틱 시작 위치에서 시야 갱신 -> 행동 트리 (이동, 아이템 줍기) -> 로그 기록
+        previous = start
+        previous_items = 0
+        for i in range(self.count):
+            changed, _ = view.update(world, explore_map, previous)
+            for (r, c) in changed:
+                delta_cells.append(r * self.cols + c)
+                delta_values.append(explore_map[r, c])
+
+            if items[i] > previous_items:
+                r, c = positions[i]
+                world[r, c] = 0
+                self.pickups[i] = r * self.cols + c
+            previous_items = items[i]
+
+            self.delta_offsets.append(len(delta_cells))
+            if i % self.interval == 0:
+                self.keyframes.append((explore_map.copy(), world.copy()))
+            previous = positions[i]
+
+        self.delta_cells = np.array(delta_cells, dtype=np.int64)
+        self.delta_values = np.array(delta_values, dtype=np.uint8)
+        self.delta_offsets = np.array(self.delta_offsets, dtype=np.int64)
+
+    def state_at(self, tick):
+        # tick 직후의 (위치, 탐험 지도, 월드, 로그 행 번호). 지도 배열은 다음 호출 때 덮어씀
+        i = int(self.row_of_tick[tick])
+        if i < 0:
+            raise KeyError(f"로그에 {tick}틱이 없습니다.")
+
+        keyframe = i // self.interval
+        explore_map, world = self.keyframes[keyframe]
+        np.copyto(self.map, explore_map)
+        np.copyto(self.world, world)
+
+        first = keyframe * self.interval + 1
+        begin, end = self.delta_offsets[first], self.delta_offsets[i + 1]
+        self.map.flat[self.delta_cells[begin:end]] = self.delta_values[begin:end]
+        picked = self.pickups[first:i + 1]
+        self.world.flat[picked[picked >= 0]] = 0
+
+        position = (int(self.columns['row'][i]), int(self.columns['col'][i]))
+        return position, self.map, self.world, i
+
+    def describe(self, i):
+        target = (int(self.columns['target_row'][i]), int(self.columns['target_col'][i]))
+        return (f"Tick {int(self.columns['tick'][i])}  {self.actions[self.columns['action'][i]]} "
+                f"{None if target[0] < 0 else target}  {self.statuses[self.columns['status'][i]]}  "
+                f"Items {int(self.columns['items'][i])}")
+
+def view(index, fps=30):
+    import pygame
+
+    pygame.init()
+    width, height = index.cols * CELL_SIZE, index.rows * CELL_SIZE
+    screen = pygame.display.set_mode((width, height + TIMELINE_HEIGHT + HUD_HEIGHT))
+    pygame.display.set_caption("Agent Replay")
+    font = pygame.font.Font(None, 20)
+    clock = pygame.time.Clock()
+    # 실시간 화면(Behavior Tree.py)과 같은 팔레트
+    renderer = grid_renderer_BT.GridRenderer(index.rows, index.cols, CELL_SIZE, grid_renderer_BT.AGENT_PALETTE)
+    panel = pygame.Rect(0, height, width, TIMELINE_HEIGHT + HUD_HEIGHT)
+
+    last_tick = len(index.row_of_tick) - 1
+    tick = 0
+    playing = False
+    dragging = False
+
+    def tick_at(x):
+        return min(max(int(x / width * (last_tick + 1)), 0), last_tick)
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_RIGHT:
+                    tick += 1
+                elif event.key == pygame.K_LEFT:
+                    tick -= 1
+                elif event.key == pygame.K_PAGEUP:
+                    tick += 100
+                elif event.key == pygame.K_PAGEDOWN:
+                    tick -= 100
+                elif event.key == pygame.K_HOME:
+                    tick = 0
+                elif event.key == pygame.K_END:
+                    tick = last_tick
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.pos[1] >= height:
+                dragging = True
+                tick = tick_at(event.pos[0])
+            elif event.type == pygame.MOUSEBUTTONUP:
+                dragging = False
+            elif event.type == pygame.MOUSEMOTION and dragging:
+                tick = tick_at(event.pos[0])
+
+        if playing:
+            tick += 1
+        tick = min(max(tick, 0), last_tick)
+        if tick == last_tick:
+            playing = False
+
+        # 로그에 없는 틱이면 가장 가까운 이전 틱을 보여줌
+        shown = tick
+        while index.row_of_tick[shown] < 0 and shown > 0:
+            shown -= 1
+        position, explore_map, world, i = index.state_at(shown)
+
+        # 지도는 바뀐 타일만 다시 그림 (가까운 틱으로 이동하면 몇 타일뿐)
+        grid_renderer_BT.compose_agent_view(renderer.cells, explore_map, world, position)
+        rects = renderer.draw(screen)
+
+        # 타임라인 (클릭하거나 끌어서 이동)
+        screen.fill(BLACK, panel)
+        pygame.draw.rect(screen, WALL_COLOR, (0, height, width, TIMELINE_HEIGHT))
+        pygame.draw.rect(screen, AGENT_COLOR, (int(tick / max(last_tick, 1) * (width - 4)), height, 4, TIMELINE_HEIGHT))
+        screen.blit(font.render(index.describe(i), True, PATH_COLOR), (4, height + TIMELINE_HEIGHT + 4))
+        screen.blit(font.render("Space: play/pause  Left/Right: 1 tick  PgUp/PgDn: 100 ticks  Home/End", True, WALL_COLOR),
+                    (4, height + TIMELINE_HEIGHT + 22))
+
+        pygame.display.update(rects + [panel])
+        clock.tick(fps)
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="에이전트 로그 다시 보기 (다시 시뮬레이션하지 않음)")
+    parser.add_argument('log', nargs='?', default='agent_log.csv', help="에이전트 로그 (.csv 또는 .bin)")
+    parser.add_argument('--maze', default='maze_grid.csv', help="로그를 남긴 실행에서 사용한 미로")
+    parser.add_argument('--vision-radius', type=int, default=2, help="실행 때와 같은 시야 반경")
+    parser.add_argument('--line-of-sight', action='store_true', help="실행 때 --line-of-sight를 썼으면 지정")
+    parser.add_argument('--interval', type=int, default=64, help="키프레임 간격 (틱)")
+    parser.add_argument('--fps', type=int, default=30)
+    args = parser.parse_args()
+
+    columns, names = read_columns(args.log)
+    index = ReplayIndex(columns, names, maze_grid.load_grid(args.maze), vision_radius = args.vision_radius,
+                        line_of_sight = args.line_of_sight, interval = args.interval)
+    print(f"{index.count}틱, 키프레임 {len(index.keyframes)}개, 델타 {len(index.delta_cells)}칸")
+    view(index, args.fps)
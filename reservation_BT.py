@@ -0,0 +1,206 @@
+from A_star_BT import DIRECTIONS
+
+class ReservationTable:
+    # 여러 에이전트의 이동을 (틱, 칸) 예약표로 정리해서 서로 부딪히지 않게 함
+    # - 행동 트리는 이동하지 않고 request()로 앞으로 지나갈 칸들(route)만 알려줌
+    # - 틱 끝의 resolve()가 우선순위대로 요청을 처리 (에이전트 번호 순서, 최근에 밀려난 에이전트는 뒤로):
+    #   이동이 정해지면 다음 window 틱 동안 지나갈 경로 칸을 예약하고,
+    #   막히면 제자리에서 기다림 (제자리는 다음 틱, 가려던 경로는 그 다음 틱부터 예약)
+    # - 아직 자리가 정해지지 않은 에이전트가 서 있는 칸과, 이번 틱에 먼저 예약된 칸으로는 들어가지 않으므로
+    #   같은 칸에 두 에이전트가 있거나 서로 자리를 바꾸며 지나가는 일이 없음
+    # - 길을 막은 에이전트들은 빈 칸 쪽으로 한 칸씩 밀어냄 (push_limit: 한 번에 밀어낼 수 있는 최대 에이전트 수)
+    #   밀 곳이 없고 막은 에이전트가 이쪽으로 오려 하면 (막다른 길에서 나오는 중) 반대로 이쪽이 밀려남
+    # - 밀려난 에이전트는 patience 틱 동안 우선순위가 뒤로 가고 자기를 밀어낸 에이전트를 되밀지 못해서,
+    #   밀어낸 쪽이 계속 같은 방향으로 지나감 (막다른 길 입구에서 두 에이전트가 번갈아 서로 밀어내기만 하는 일이 없게)
+    # - 탈출 지점으로는 밀지 않음 (탐험을 마치지 않은 에이전트가 밀려서 탈출하지 않게)
+    # - 그래도 patience 틱 넘게 기다린 에이전트는 stuck()이 True -> 행동 트리가 이동 실패로 처리해서
+    #   막힌 칸을 돌아가는 다른 목표를 고름 (마주 보고 막힌 줄이 한쪽부터 돌아서서 풀림)
+    def __init__(self, rows, cols, window = 4, push_limit = 8, patience = 8):
+        self.rows = rows
+        self.cols = cols
+        self.window = window
+        self.push_limit = push_limit
+        self.patience = patience
+        self.requests = {} # 에이전트 번호 -> 앞으로 지나갈 칸 목록 (첫 칸이 이번 틱에 가고 싶은 칸)
+        self.blocked = {}  # 에이전트 번호 -> 연속으로 기다린 틱 수
+        self.yield_until = {} # 에이전트 번호 -> 이 라운드까지는 우선순위를 양보 (밀려난 에이전트)
+        self.pushed_by = {}   # 밀려난 에이전트 번호 -> 밀어낸 에이전트 번호 (양보하는 동안 되밀지 않음)
+        self.rounds = 0    # resolve() 호출 횟수
+
+        # 통계
+        self.moves = 0     # 요청대로 이동한 횟수
+        self.waits = 0     # 충돌을 피하려고 기다린 횟수
+        self.pushes = 0    # 다른 에이전트에게 밀려난 횟수
+
+    def request(self, agent, route):
+        # route가 agent.path 자체이면 이동이 정해질 때 첫 칸을 꺼냄
+        self.requests[agent.agent_id] = route
+
+    def stuck(self, agent):
+        # 너무 오래 기다렸으면 True (한 번 알려주면 다시 0부터 셈)
+        if self.blocked.get(agent.agent_id, 0) < self.patience:
+            return False
+        del self.blocked[agent.agent_id]
+        return True
+
+    def resolve(self, agents):
+        # agents: 이번 틱에 남아 있는 에이전트들 (에이전트 번호 순서)
+        self.slots = {}    # (몇 틱 뒤, 칸) -> 예약한 에이전트 번호 (이번 틱에 새로 만듦)
+        self.occupied = {agent.position: agent for agent in agents} # 틱 시작 때 위치
+        self.decided = set() # 다음 틱 위치가 정해진 에이전트
+        slots = self.slots
+
+        # 최근에 밀려난 에이전트일수록 뒤로 (밀어낸 쪽이 다음 틱에도 먼저 움직여서 줄이 한 방향으로 계속 물러남)
+        self.rounds += 1
+        rounds = self.rounds
+        yield_until = self.yield_until
+        if yield_until:
+            for agent_id in [agent_id for agent_id, until in yield_until.items() if until < rounds]:
+                del yield_until[agent_id]
+                del self.pushed_by[agent_id]
+            agents = sorted(agents, key = lambda agent: yield_until.get(agent.agent_id, 0))
+
+        waiting = [] # 이번 틱에 움직이지 못한 에이전트 (틱 끝까지는 뒤 순서 에이전트가 밀어낼 수 있음)
+        for agent in agents:
+            agent_id = agent.agent_id
+            if agent_id in self.decided:
+                continue # 이번 틱에 이미 밀려남
+
+            route = self.requests.get(agent_id)
+            target = route[0] if route else None
+
+            # 앞선 에이전트가 곧 지나갈 칸이 아니고, 비어 있거나 막고 있는 에이전트를 밀어낼 수 있으면 이동
+            if target is not None and not self.reserved_by_other(target, agent_id, 2):
+                if self.free(target, agent_id) or self.push(agent, target, route):
+                    del self.requests[agent_id]
+                    self.advance(agent, route)
+                    continue
+
+            # 마주 보고 막혔으면 (막은 에이전트가 이 칸으로 오려 함) 상대가 이 에이전트를 뒤로 밀고 지나감
+            # (막다른 길 안에서 나오려는 쪽은 물러날 곳이 없으므로 들어가려는 쪽이 물러남)
+            other = self.occupied.get(target) if target is not None else None
+            if other is not None and other.agent_id not in self.decided:
+                other_route = self.requests.get(other.agent_id)
+                if other_route and other_route[0] == agent.position and \
+                        not self.reserved_by_other(agent.position, other.agent_id, 2) and \
+                        self.push(other, agent.position, other_route):
+                    del self.requests[other.agent_id]
+                    self.advance(other, other_route)
+                    continue
+            waiting.append(agent)
+
+        # 끝까지 밀려나지 않은 에이전트는 제자리에서 기다림
+        for agent in waiting:
+            agent_id = agent.agent_id
+            if agent_id in self.decided:
+                continue
+            slots[(1, agent.position)] = agent_id
+            route = self.requests.get(agent_id)
+            if route:
+                self.waits += 1
+                self.blocked[agent_id] = self.blocked.get(agent_id, 0) + 1
+                self.reserve(agent_id, [agent.position] + route) # 가려던 경로는 한 틱씩 늦춰서 예약
+            self.decided.add(agent_id)
+        self.requests.clear()
+
+    def advance(self, agent, route):
+        # 요청한 첫 칸으로 이동하고 그 뒤 경로를 예약
+        target = route.pop(0)
+        agent.position = target
+        self.slots[(1, target)] = agent.agent_id
+        self.blocked.pop(agent.agent_id, None)
+        self.moves += 1
+        self.reserve(agent.agent_id, route)
+        self.decided.add(agent.agent_id)
+
+    def reserve(self, agent_id, route):
+        # 앞으로 지나갈 경로 칸을 2틱 뒤부터 예약 (이미 다른 에이전트가 예약한 틱에서 멈춤)
+        slots = self.slots
+        for step, position in enumerate(route[:self.window - 1], 2):
+            if (step, position) in slots:
+                break
+            slots[(step, position)] = agent_id
+
+    def free(self, position, agent_id):
+        # 다음 틱에 position으로 들어갈 수 있는지
+        other = self.occupied.get(position)
+        if other is not None and other.agent_id != agent_id and other.agent_id not in self.decided:
+            return False # 아직 움직일지 모르는 에이전트가 서 있음
+        owner = self.slots.get((1, position))
+        return owner is None or owner == agent_id
+
+    def reserved_by_other(self, position, agent_id, last):
+        for step in range(1, last + 1):
+            owner = self.slots.get((step, position))
+            if owner is not None and owner != agent_id:
+                return True
+        return False
+
+    def push(self, agent, target, route):
+        # target부터 아직 자리가 정해지지 않은 에이전트들이 이어서 서 있는 칸을 따라 가장 가까운 빈 칸을 찾고,
+        # 그 줄을 빈 칸 쪽으로 한 칸씩 옮김 (agent의 경로 밖에 있는 빈 칸을 먼저 고름)
+        occupied = self.occupied
+        decided = self.decided
+        blocker = occupied.get(target)
+        if blocker is None or blocker.agent_id in decided or (1, target) in self.slots:
+            return False # 이미 다른 에이전트가 다음 틱에 들어가기로 한 칸
+        if agent.agent_id in self.yield_until and self.pushed_by.get(agent.agent_id) == blocker.agent_id:
+            return False # 방금 나를 밀어낸 에이전트는 되밀지 않음 (두 에이전트가 번갈아 서로 밀어내는 일이 없게)
+        on_route = set(route[:self.window])
+
+        parent = {target: None}
+        level = [target]
+        found = None
+        for _ in range(self.push_limit):
+            fallback = None
+            next_level = []
+            for cell in level:
+                pushed = occupied[cell]
+                r, c = cell
+                for move_r, move_c in DIRECTIONS:
+                    position = (r + move_r, c + move_c)
+                    if position in parent or position == agent.position:
+                        continue
+                    if not (0 <= position[0] < self.rows and 0 <= position[1] < self.cols):
+                        continue
+                    if pushed.map[position] in (1, 3):
+                        continue # 벽이거나 아직 모르는 칸
+                    if position == pushed.memory.get('end_point'):
+                        continue # 탈출 지점
+                    other = occupied.get(position)
+                    if other is not None and other.agent_id not in decided:
+                        parent[position] = cell
+                        next_level.append(position) # 이 에이전트도 밀어야 함
+                    elif self.free(position, pushed.agent_id):
+                        parent[position] = cell
+                        if position not in on_route and not self.reserved_by_other(position, agent.agent_id, self.window):
+                            found = position
+                            break
+                        if fallback is None:
+                            fallback = position
+                if found is not None:
+                    break
+            if found is None:
+                found = fallback
+            if found is not None or not next_level:
+                break
+            level = next_level
+
+        if found is None:
+            return False
+
+        # 빈 칸에 가까운 에이전트부터 한 칸씩 옮김 (밀린 에이전트는 다음 틱에 경로를 다시 계획)
+        cell = found
+        while cell != target:
+            previous = parent[cell]
+            pushed = occupied[previous]
+            pushed.position = cell
+            pushed.path = []
+            pushed.memory.pop('current_target', None)
+            self.slots[(1, cell)] = pushed.agent_id
+            decided.add(pushed.agent_id)
+            self.yield_until[pushed.agent_id] = self.rounds + self.patience
+            self.pushed_by[pushed.agent_id] = agent.agent_id
+            self.pushes += 1
+            cell = previous
+        return True
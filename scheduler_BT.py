@@ -0,0 +1,109 @@
+import time
+# pygame은 화면에 카운터를 그릴 때만 import
+
+class FixedTimestep:
+    # 시뮬레이션 틱과 화면 프레임을 따로 도는 스케줄러
+    # - 틱은 ticks_per_second 간격으로 (None이면 다음 프레임 전까지 최대한 많이) 실행
+    # - 화면은 fps 간격으로 그림
+    # - 시뮬레이션이 밀리면 틱은 건너뛰지 않고 모두 실행하고, 대신 프레임을 건너뜀
+    #   (단, max_frame_skip 프레임 동안 한 번도 못 그렸으면 한 번은 그림)
+    def __init__(self, ticks_per_second=None, fps=60, max_frame_skip=10):
+        self.tick_interval = 1.0 / ticks_per_second if ticks_per_second else None
+        self.frame_interval = 1.0 / fps
+        self.max_frame_skip = max_frame_skip
+
+        now = time.perf_counter()
+        self.next_tick = now
+        self.next_frame = now
+        self.last_render = now
+        self.render_start = now
+
+        self.ticks = 0
+        self.frames = 0
+        self.dropped_frames = 0
+
+        # 화면에 보여줄 카운터 (1초마다 갱신)
+        self.window_start = now
+        self.window_ticks = 0
+        self.window_frames = 0
+        self.tick_rate = 0.0
+        self.frame_rate = 0.0
+        self.frame_time = 0.0 # 마지막 프레임을 그리는 데 걸린 시간 (초)
+        self.font = None
+
+    def due_ticks(self):
+        # 지금 실행할 틱마다 한 번씩 반환 (for 문으로 돌리고, 시뮬레이션이 끝나면 break 해도 됨)
+        started = False
+        while True:
+            now = time.perf_counter()
+            if self.tick_interval is None:
+                if started and now >= self.next_frame:
+                    return
+            else:
+                if now < self.next_tick:
+                    return
+                if now - self.last_render >= self.max_frame_skip * self.frame_interval:
+                    return # 너무 오래 못 그렸으면 밀린 틱은 남겨두고 한 번 그림
+                self.next_tick += self.tick_interval
+            started = True
+            self.ticks += 1
+            self.window_ticks += 1
+            yield
+
+    def should_render(self):
+        now = time.perf_counter()
+        if now < self.next_frame:
+            return False
+        self.render_start = now
+        return True
+
+    def frame_done(self):
+        # 그리기가 끝나면 호출. 틱 때문에 놓친 프레임 수를 세고 다음 프레임 시각을 정함
+        now = time.perf_counter()
+        self.frame_time = now - self.render_start
+        self.frames += 1
+        self.window_frames += 1
+        self.last_render = now
+
+        missed = int((now - self.next_frame) // self.frame_interval)
+        self.dropped_frames += missed
+        self.next_frame += self.frame_interval * (missed + 1)
+
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            self.tick_rate = self.window_ticks / elapsed
+            self.frame_rate = self.window_frames / elapsed
+            self.window_start = now
+            self.window_ticks = 0
+            self.window_frames = 0
+
+    def wait(self, idle=False):
+        # 다음 틱이나 프레임까지 잠깐 쉼 (최대 속도 모드에서는 시뮬레이션이 끝난 뒤(idle)에만)
+        if self.tick_interval is None and not idle:
+            return
+        deadline = self.next_frame
+        if self.tick_interval is not None and not idle:
+            deadline = min(deadline, self.next_tick)
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def draw_counters(self, screen, position, color=(255, 255, 255), background=(0, 0, 0)):
+        # 틱 수, 초당 틱, FPS, 프레임 시간, 건너뛴 프레임을 그리고 다시 그린 영역을 반환
+        import pygame
+
+        if self.font is None:
+            pygame.font.init()
+            self.font = pygame.font.Font(None, 20)
+
+        lines = [
+            f"Sim ticks: {self.ticks} ({self.tick_rate:.0f}/s)",
+            f"FPS: {self.frame_rate:.1f}  frame {self.frame_time * 1000:.1f} ms",
+            f"Dropped frames: {self.dropped_frames}",
+        ]
+        line_height = self.font.get_linesize()
+        area = pygame.Rect(position[0], position[1], 260, line_height * len(lines))
+        screen.fill(background, area)
+        for i, line in enumerate(lines):
+            screen.blit(self.font.render(line, True, color), (position[0], position[1] + i * line_height))
+        return area
@@ -0,0 +1,32 @@
+from A_star_BT import ZERO_HEURISTIC, grid_cells, iter_astar_cells, iter_bidirectional_cells
+
+class PositionHeuristic:
+    # heuristic((row, col), target) 함수를 셀 인덱스로 읽는 휴리스틱 테이블로 감쌈
+    def __init__(self, heuristic, target, cols):
+        self.heuristic = heuristic
+        self.target = target
+        self.cols = cols
+
+    def __getitem__(self, index):
+        return self.heuristic(divmod(index, self.cols), self.target)
+
+def search_steps(grid, start, end, heuristic=None):
+    # A*/Dijkstra 시각화용 탐색을 한 번 확장할 때마다 멈추는 제너레이터
+    # heuristic(position, end)가 없으면 Dijkstra (f = g)
+    # 탐색은 A_star_BT.iter_astar_cells를 그대로 사용하므로 이벤트도 같음:
+    #   ('expand', 확장한 칸, [이번에 열린 리스트에 들어간 칸들])
+    #   ('found', 경로)  - 도착점을 확장했을 때 (확장 이벤트 대신)
+    #   ('failed', None) - 열린 리스트가 비었을 때
+    cells, rows, cols = grid_cells(grid)
+    table = ZERO_HEURISTIC if heuristic is None else PositionHeuristic(heuristic, end, cols)
+    return iter_astar_cells(start, end, cells, rows, cols, table, steps=True)
+
+def bidirectional_steps(grid, start, end, heuristic=None):
+    # 출발점과 도착점에서 번갈아 한 번씩 확장하는 양방향 탐색 (A_star_BT.iter_bidirectional_cells를 그대로 사용)
+    # heuristic이 없으면 양방향 Dijkstra, 있으면 정방향은 heuristic(칸, end), 역방향은 heuristic(칸, start)
+    # 이벤트는 search_steps()와 같고, 'found' 이벤트에 (정방향, 역방향) 확장 수가 붙음
+    cells, rows, cols = grid_cells(grid)
+    if heuristic is None:
+        return iter_bidirectional_cells(start, end, cells, rows, cols, use_heuristic=False, steps=True)
+    return iter_bidirectional_cells(start, end, cells, rows, cols, PositionHeuristic(heuristic, end, cols),
+                                    backward_table=PositionHeuristic(heuristic, start, cols), steps=True)
@@ -0,0 +1,25 @@
+import numpy as np
+import frontier_BT
+import world_index_BT
+
+class SharedMap:
+    # 탐험 지도와 그 지도에서 계산하는 구조들 (프런티어, 월드 통계, 탈출 거리 지도)
+    # 에이전트 하나가 혼자 쓰거나, 여러 에이전트가 같이 써서 한 에이전트가 본 칸을 모두가 알게 함
+    # 에이전트마다 따로 갖는 경로 계획기(D* Lite)는 changes에서 자기가 아직 읽지 않은 칸만 가져감
+    def __init__(self, grid):
+        self.map = np.full_like(grid, 3) # 맵 전체를 미확인 상태로
+        self.frontier = frontier_BT.FrontierMap(self.map)
+        self.world = world_index_BT.WorldIndex(grid, self.map)
+        self.exit_field = None # 탈출 지점까지의 거리 지도 (Exit 노드가 처음 실행될 때 만듦)
+        self.changes = []      # 지금까지 값이 바뀐 칸 (순서대로)
+
+    def reveal(self, changed, newly_explored):
+        # 어느 에이전트든 지도를 바꾸면 호출 (바뀐 칸은 한 번만 들어옴)
+        self.frontier.reveal(changed)
+        self.world.reveal(newly_explored)
+        for position in changed:
+            if self.map[position] != world_index_BT.ITEM:
+                self.world.remove_item(position) # 다른 에이전트가 이미 주운 아이템을 봄 (지도를 따로 쓸 때)
+        if self.exit_field is not None:
+            self.exit_field.update_cells(changed)
+        self.changes.extend(changed)
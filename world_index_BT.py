@@ -0,0 +1,72 @@
+import numpy as np
+
+ITEM = 2
+UNKNOWN = 3
+
+class WorldIndex:
+    # 틱마다 맵 전체를 훑지 않도록 유지하는 월드 통계
+    # - 탐험한 칸 수, 남은 아이템 수 (누적 카운트)
+    # - 아이템 위치의 공간 인덱스 (bucket_size x bucket_size 칸 단위 버킷)
+    def __init__(self, grid, explore_map, bucket_size=8):
+        self.rows = len(grid)
+        self.cols = len(grid[0])
+        self.size = self.rows * self.cols
+        self.bucket_size = bucket_size
+
+        self.explored_count = int(np.count_nonzero(np.asarray(explore_map) != UNKNOWN))
+
+        self.buckets = {} # (버킷 행, 버킷 열) -> 아이템 위치 집합
+        self.items_remaining = 0
+        for r, c in np.argwhere(np.asarray(grid) == ITEM).tolist():
+            self.add_item((r, c))
+
+    def bucket_of(self, position):
+        return (position[0] // self.bucket_size, position[1] // self.bucket_size)
+
+    def add_item(self, position):
+        self.buckets.setdefault(self.bucket_of(position), set()).add(position)
+        self.items_remaining += 1
+
+    def remove_item(self, position):
+        # MoveToItem에서 아이템을 주웠을 때 호출
+        bucket = self.buckets.get(self.bucket_of(position))
+        if bucket and position in bucket:
+            bucket.discard(position)
+            if not bucket:
+                del self.buckets[self.bucket_of(position)]
+            self.items_remaining -= 1
+
+    def reveal(self, newly_explored):
+        # update_exploration_map에서 처음 알게 된 칸 수만큼 증가
+        self.explored_count += newly_explored
+
+    def has_item(self, position):
+        # 아직 줍지 않은 아이템인지 (다른 에이전트가 먼저 주웠는지 확인)
+        return position in self.buckets.get(self.bucket_of(position), ())
+
+    def has_items(self):
+        return self.items_remaining > 0
+
+    def explored_percent(self):
+        return self.explored_count / self.size * 100
+
+    def items_in_window(self, position, radius):
+        # position 주변 (2*radius+1) 정사각형 안의 아이템 (겹치는 버킷만 확인)
+        r, c = position
+        r0, r1 = r - radius, r + radius
+        c0, c1 = c - radius, c + radius
+        items = []
+        for br in range(max(r0, 0) // self.bucket_size, min(r1, self.rows - 1) // self.bucket_size + 1):
+            for bc in range(max(c0, 0) // self.bucket_size, min(c1, self.cols - 1) // self.bucket_size + 1):
+                for item in self.buckets.get((br, bc), ()):
+                    if r0 <= item[0] <= r1 and c0 <= item[1] <= c1:
+                        items.append(item)
+        return items
+
+    def nearest_item(self, position, radius):
+        # 시야 안에서 맨해튼 거리가 가장 가까운 아이템 (같으면 행, 열 순서로 앞선 칸)
+        items = self.items_in_window(position, radius)
+        if not items:
+            return None
+        r, c = position
+        return min(items, key=lambda item: (abs(r - item[0]) + abs(c - item[1]), item[0], item[1]))